@@ -0,0 +1,141 @@
+import math
+from collections import namedtuple
+
+# state is "firing" or "cleared"; value is what the rule compared (the
+# metric, or its per-second rate for rate rules)
+AlertEvent = namedtuple("AlertEvent", ["rule", "state", "value", "time"])
+
+# Used until the settings file lists its own rules
+DEFAULT_RULES = [
+    {"name": "High CPU", "metric": "cpu_usage", "above": 90, "clear": 80, "for": 30},
+    {"name": "Disk nearly full", "metric": "disk_usage", "above": 90, "clear": 85},
+    {"name": "Temperature rising fast", "metric": "temperature", "rate": True,
+     "above": 1.0, "clear": 0.2, "window": 10},
+]
+
+class AlertRule:
+    """A threshold on one metric, or on its rate of change.
+
+    The rule fires once the value has been past `above`/`below` for
+    `duration` seconds and clears only when it comes back past `clear`,
+    so a value hovering at the threshold doesn't flap. With rate=True the
+    compared value is the per-second change, smoothed with an EWMA over
+    `window` seconds. Each sample costs O(1) - no history is kept.
+    """
+    def __init__(self, name, metric, above=None, below=None, clear=None, duration=0, rate=False, window=10):
+        if (above is None) == (below is None):
+            raise ValueError(f"rule {name!r} needs exactly one of 'above' or 'below'")
+        self.name = name
+        self.metric = metric
+        self.above = above
+        self.below = below
+        threshold = above if above is not None else below
+        self.clear = threshold if clear is None else clear
+        self.duration = duration
+        self.rate = rate
+        self.window = max(window, 0.001)
+
+        self.firing = False
+        self.breached_since = None
+        self.value = None  # last compared value
+        self.last = None  # (time, value) of the previous sample, rate rules only
+        self.smoothed_rate = None
+
+    @classmethod
+    def from_dict(cls, data):
+        try:
+            return cls(
+                data["name"], data["metric"], data.get("above"), data.get("below"),
+                data.get("clear"), data.get("for", 0), data.get("rate", False), data.get("window", 10),
+            )
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"invalid alert rule {data!r}: {e}")
+
+    def breached(self, value):
+        return value > self.above if self.above is not None else value < self.below
+
+    def cleared(self, value):
+        return value <= self.clear if self.above is not None else value >= self.clear
+
+    def observe(self, value, now):
+        """Feed one sample, return "firing"/"cleared" on a state change, else None"""
+        if self.rate:
+            if self.last is None or now <= self.last[0]:
+                self.last = (now, value)
+                return None
+            last_time, last_value = self.last
+            elapsed = now - last_time
+            rate = (value - last_value) / elapsed
+            alpha = 1 - math.exp(-elapsed / self.window)
+            self.smoothed_rate = rate if self.smoothed_rate is None else self.smoothed_rate + alpha * (rate - self.smoothed_rate)
+            self.last = (now, value)
+            value = self.smoothed_rate
+        self.value = value
+
+        if self.firing:
+            if self.cleared(value):
+                self.firing = False
+                self.breached_since = None
+                return "cleared"
+            return None
+        if not self.breached(value):
+            self.breached_since = None
+            return None
+        if self.breached_since is None:
+            self.breached_since = now
+        if now - self.breached_since >= self.duration:
+            self.firing = True
+            return "firing"
+        return None
+
+class AlertEngine:
+    """Evaluates alert rules as samples arrive.
+
+    observe() is fed by SystemMonitor for every collected value and only
+    touches the rules on that metric. State changes are passed to the
+    on_alert callback, from the sampler thread.
+    """
+    def __init__(self, rules=()):
+        self.by_metric = {}
+        self.set_rules(rules)
+
+    def set_rules(self, rules):
+        by_metric = {}
+        for rule in rules:
+            by_metric.setdefault(rule.metric, []).append(rule)
+        # Swapped in one assignment - the sampler thread may be evaluating
+        self.by_metric = by_metric
+
+    def rules(self):
+        return [rule for rules in self.by_metric.values() for rule in rules]
+
+    def firing(self):
+        return [rule for rule in self.rules() if rule.firing]
+
+    def observe(self, metric, value, now):
+        rules = self.by_metric.get(metric)
+        if not rules:
+            return
+        for rule in rules:
+            state = rule.observe(value, now)
+            if state is not None and hasattr(self, 'on_alert'):
+                self.on_alert(AlertEvent(rule, state, rule.value, now))
+
+def load_rules(definitions, metrics=None):
+    """AlertRules from settings dicts; invalid entries are reported and skipped.
+
+    If `metrics` is given, rules on any other metric are skipped as well,
+    since they would never see a value.
+    """
+    rules = []
+    for data in definitions:
+        try:
+            rule = AlertRule.from_dict(data)
+        except ValueError as e:
+            print(f"Skipping alert rule: {e}")
+            continue
+        if metrics is not None and rule.metric not in metrics:
+            print(f"Skipping alert rule {rule.name!r}: unknown metric {rule.metric!r}")
+            continue
+        rules.append(rule)
+    return rules
@@ -0,0 +1,110 @@
+"""Count Qt polish/style events caused by one display tick.
+
+Every re-polish of a widget (setStyleSheet, theme change) is delivered as a
+StyleChange event, so those are the main number to watch.
+
+Compares the current painted progress bars against the previous approach of
+rebuilding a gradient stylesheet on every card each tick, and measures the
+cost of a theme toggle.
+
+    python benchmarks/bench_polish.py [ticks]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication, QFrame
+from PyQt5.QtCore import QObject, QEvent
+from system_monitor import SystemMonitor
+from ui_main import MainWindow
+
+COUNTED_EVENTS = {
+    QEvent.Polish: "polish",
+    QEvent.PolishRequest: "polish_request",
+    QEvent.StyleChange: "style_change",
+}
+
+class EventCounter(QObject):
+    def __init__(self):
+        super().__init__()
+        self.counts = dict.fromkeys(COUNTED_EVENTS.values(), 0)
+
+    def reset(self):
+        for key in self.counts:
+            self.counts[key] = 0
+
+    def eventFilter(self, obj, event):
+        name = COUNTED_EVENTS.get(event.type())
+        if name:
+            self.counts[name] += 1
+        return False
+
+def legacy_update(window, bars, snapshot):
+    """Per-tick stylesheet rebuild as done before the painted Sparkline"""
+    cards = (window.cpu_card, window.ram_card, window.gpu_card, window.disk_card)
+    values = (snapshot.cpu_usage, snapshot.ram_usage, snapshot.gpu_usage, snapshot.disk_usage)
+    for card, bar, value in zip(cards, bars, values):
+        card.value_label.setText(f"{value}%")
+        bar.setStyleSheet(f"""
+            #miniProgress {{
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                    stop:0 {card.color}, stop:{max(0.01, value/100)} {card.color},
+                    stop:{max(0.01, value/100)} rgba(255, 255, 255, 20), stop:1 rgba(255, 255, 255, 20));
+                border-radius: 2px;
+            }}
+        """)
+
+def measure(app, counter, ticks, update):
+    counter.reset()
+    started = time.perf_counter()
+    for i in range(ticks):
+        update(i)
+        app.processEvents()
+    elapsed = time.perf_counter() - started
+    result = {key: value / ticks for key, value in counter.counts.items()}
+    result["usec"] = elapsed / ticks * 1e6
+    return result
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    app = QApplication(sys.argv)
+    monitor = SystemMonitor()
+    # The first pass only sets the CPU baseline; GPU needs a CPU reading too
+    monitor.update_all()
+    time.sleep(0.1)
+    monitor.update_all()
+    base = monitor.snapshot()
+
+    window = MainWindow(monitor, None)
+    bars = []
+    for card in (window.cpu_card, window.ram_card, window.gpu_card, window.disk_card):
+        bar = QFrame()
+        bar.setObjectName("miniProgress")
+        bar.setFixedHeight(4)
+        card.layout().addWidget(bar)
+        bars.append(bar)
+    window.show()
+    app.processEvents()
+
+    counter = EventCounter()
+    app.installEventFilter(counter)
+
+    def snapshot_for(i):
+        return base.replace(cpu_usage=i % 100, ram_usage=(i * 7) % 100,
+                            collected_at=base.collected_at._replace(cpu=i, ram=i))
+
+    current = measure(app, counter, ticks, lambda i: window.update_display(snapshot_for(i)))
+    legacy = measure(app, counter, ticks, lambda i: legacy_update(window, bars, snapshot_for(i)))
+    toggle = measure(app, counter, 2, lambda i: window.apply_theme("light" if i % 2 == 0 else "dark"))
+
+    print(f"events per tick over {ticks} ticks")
+    print(f"{'':16}{'current':>10}{'legacy':>10}{'theme toggle':>14}")
+    for key in list(COUNTED_EVENTS.values()) + ["usec"]:
+        print(f"{key:16}{current[key]:>10.2f}{legacy[key]:>10.2f}{toggle[key]:>14.2f}")
+    print(f"label updates: {window.display_diff.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Per-call cost of the /proc reader versus the equivalent psutil calls.
+
+    python benchmarks/bench_procfs.py [iterations]
+
+Linux only. Reports mean microseconds and allocated bytes per call, then
+the process table walk - live and on the 2000-process fixture - with the
+processes period it needs to stay within PROCESS_CPU_PERCENT.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psutil
+from fixtures import Fixture
+from processes import ProcessCollector
+from procfs import ProcStats
+from system_monitor import PROCESS_CPU_PERCENT, process_period
+
+def measure(func, iterations):
+    func()  # warm up caches and lazily opened handles
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+    func()
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return elapsed / iterations * 1e6, peak
+
+def main():
+    if not ProcStats.supported():
+        print("procfs reader is Linux only")
+        return
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    proc = ProcStats()
+    cases = [
+        ("cpu", lambda: psutil.cpu_times(percpu=True), proc.cpu_times),
+        ("memory", psutil.virtual_memory, proc.memory_percent),
+        ("network", lambda: psutil.net_io_counters(pernic=True), proc.network_counters),
+        ("disk", lambda: psutil.disk_io_counters(perdisk=True), proc.disk_counters),
+    ]
+
+    print(f"{'collector':10}{'psutil us':>12}{'procfs us':>12}{'speedup':>9}{'psutil B':>11}{'procfs B':>11}")
+    total_psutil = total_procfs = 0.0
+    for name, psutil_call, procfs_call in cases:
+        psutil_us, psutil_bytes = measure(psutil_call, iterations)
+        procfs_us, procfs_bytes = measure(procfs_call, iterations)
+        total_psutil += psutil_us
+        total_procfs += procfs_us
+        print(f"{name:10}{psutil_us:>12.1f}{procfs_us:>12.1f}{psutil_us / procfs_us:>8.1f}x"
+              f"{psutil_bytes:>11}{procfs_bytes:>11}")
+    print(f"{'per tick':10}{total_psutil:>12.1f}{total_procfs:>12.1f}{total_psutil / total_procfs:>8.1f}x")
+
+    # Walks are far slower than the per-tick readers, so they get fewer runs
+    walk_iterations = max(5, iterations // 100)
+    psutil_us, psutil_bytes = measure(ProcessCollector().sample, walk_iterations)
+    procfs_us, procfs_bytes = measure(ProcessCollector(proc).sample, walk_iterations)
+    print(f"{'processes':10}{psutil_us:>12.1f}{procfs_us:>12.1f}{psutil_us / procfs_us:>8.1f}x"
+          f"{psutil_bytes:>11}{procfs_bytes:>11}")
+
+    fixture = Fixture(tempfile.mkdtemp(prefix="aerohud_bench_"))
+    collector = ProcessCollector(ProcStats(fixture.proc))
+    fixture_us, _ = measure(collector.sample, walk_iterations)
+    print(f"\nprocess walk, at most {PROCESS_CPU_PERCENT:g}% of one core:")
+    for label, walk_us in (("live", procfs_us), (f"{len(fixture.pids)} processes", fixture_us)):
+        print(f"  {label:16}{walk_us / 1000:>7.1f} ms  period >= {process_period(walk_us / 1e6):.1f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""UI throughput: replay recorded snapshots into the views as fast as possible.
+
+    python benchmarks/bench_replay.py [LOG] [--frames N] [--no-widget] [--save FILE]
+
+LOG is a recording made with `main.py --record` or `--headless --record`.
+Without one, a synthetic load pattern is generated: CPU pegged near 100%
+with a 1 GB/s network burst, disk churn and top-process lists changing
+every few frames. Frames go through the same ReplayPlayer the app uses for
+--replay at max speed, one frame per event-loop iteration, so layout and
+painting are included; the result is the frames per second the render path
+sustains, plus paint events per frame. --save keeps the synthetic log for
+replaying in the app.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QObject, QEvent
+from processes import ProcessInfo, TopProcesses
+from replay import SnapshotRecorder, read_log
+from system_monitor import SystemMonitor, InterfaceRate, DiskRate
+
+GB = 1024 ** 3
+
+def synthetic_log(path, frames, interval=0.25):
+    """Write a CPU-pegged, network-burst load pattern to `path`"""
+    monitor = SystemMonitor()
+    monitor.update_all()
+    base = monitor.snapshot()
+    recorder = SnapshotRecorder(path)
+    for i in range(frames):
+        burst = i % 40 < 20  # 1 GB/s for 20 frames, then quiet for 20
+        download = GB * (0.9 + 0.1 * (i % 3)) if burst else 2048.0 * (i % 5)
+        cores = tuple(90 + (i * 7 + core * 3) % 10 for core in range(8))
+        top = None
+        if i % 12 == 0:
+            rows = [ProcessInfo(1000 + n, f"worker-{(i // 12 + n) % 9}", 99.0 - n * 11, (n + 1) * 200 * 1024 ** 2, n * 4096.0)
+                    for n in range(5)]
+            top = TopProcesses(tuple(rows), tuple(rows[::-1]), tuple(rows))
+        snapshot = base.replace(
+            cpu_usage=95 + i % 5, cpu_per_core=cores, cpu_user=70.0 + i % 7, cpu_system=20.0 + i % 3,
+            ram_usage=60 + (i // 10) % 30, gpu_usage=100,
+            network_download=download, network_download_smoothed=download * 0.8,
+            network_upload=download / 20, network_upload_smoothed=download / 25,
+            network_interfaces=(InterfaceRate("eth0", download, download / 20, download * 0.8, download / 25),),
+            disk_read=(i % 11) * 50e6, disk_write=(i % 13) * 40e6, disk_busy=float(i * 17 % 100),
+            disk_devices=(DiskRate("nvme0n1", (i % 11) * 50e6, (i % 13) * 40e6, 900.0, 700.0, float(i * 17 % 100)),),
+            temperature=70.0 + i % 25,
+            top_processes=top if top is not None else base.top_processes,
+            collected_at=base.collected_at._replace(
+                cpu=i * interval, ram=i * interval, gpu=i * interval, disk_io=i * interval,
+                network=i * interval, temperature=i * interval,
+            ),
+        )
+        base = snapshot
+        recorder.write(snapshot, i * interval)
+    recorder.close()
+    if monitor.procfs is not None:
+        monitor.procfs.close()
+
+class PaintCounter(QObject):
+    def __init__(self):
+        super().__init__()
+        self.paints = 0
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            self.paints += 1
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay snapshots into the UI at max speed")
+    parser.add_argument("log", nargs="?", help="recorded snapshot log (default: synthetic load)")
+    parser.add_argument("--frames", type=int, default=2000, help="synthetic frames to generate")
+    parser.add_argument("--no-widget", action="store_true", help="only drive the main window")
+    parser.add_argument("--save", metavar="FILE", help="keep the synthetic log at FILE")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    from scheduler import AlignedScheduler
+    from settings import Settings
+    from ui_main import MainWindow
+    from ui_replay import ReplayPlayer
+    from ui_widget import FloatingWidget
+
+    with tempfile.TemporaryDirectory(prefix="aerohud_replay_") as directory:
+        path = args.log
+        if path is None:
+            path = args.save or os.path.join(directory, "synthetic.rec")
+            synthetic_log(path, args.frames)
+        records = read_log(path)
+
+        monitor = SystemMonitor()
+        settings = Settings(directory)
+        window = MainWindow(monitor, settings)
+        window.show()
+        views = [window]
+        if not args.no_widget:
+            widget = FloatingWidget(monitor, settings, AlignedScheduler())
+            widget.show()
+            views.append(widget)
+        app.processEvents()
+
+        def show(snapshot):
+            for view in views:
+                view.update_display(snapshot)
+
+        counter = PaintCounter()
+        app.installEventFilter(counter)
+        result = {}
+
+        def finished(frames, fps):
+            result.update(frames=frames, fps=fps)
+            app.quit()
+
+        player = ReplayPlayer(records, show, speed=None)
+        player.finished.connect(finished)
+        player.start()
+        app.exec_()
+        app.removeEventFilter(counter)
+
+    frames = result["frames"]
+    print(f"{frames} frames from {'synthetic load' if args.log is None else args.log}")
+    print(f"{result['fps']:.1f} fps ({1000 / result['fps']:.2f} ms/frame), "
+          f"{counter.paints / frames:.1f} paint events/frame")
+
+if __name__ == "__main__":
+    main()
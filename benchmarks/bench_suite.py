@@ -0,0 +1,247 @@
+"""Benchmark suite: collector latency, full-tick cost and UI update paths.
+
+    python benchmarks/bench_suite.py [--live] [--iterations N] [--output FILE] [--compare BASELINE]
+
+Runs headless on Linux with the offscreen Qt platform. By default the /proc
+and /sys based collectors read a synthetic fixture tree (see fixtures.py), so
+results don't depend on the machine's load; --live measures the real system.
+Collectors without a file-backed source (disk capacity, battery, GPU, own usage)
+always run live and are marked so.
+
+Reported per case: mean/p50/p95 microseconds, peak bytes allocated by one
+call (tracemalloc), and for UI cases the polish/style/paint events and label
+updates per tick. --output writes everything as JSON; --compare prints the
+relative change against an earlier JSON file.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import Fixture
+from processes import ProcessCollector
+from procfs import ProcStats
+from system_monitor import SystemMonitor
+from temperature import SysfsTemperatureCollector
+
+# Collectors that read through ProcStats/sysfs and can use the fixture
+FIXTURE_COLLECTORS = ("cpu", "ram", "network", "disk_io", "temperature", "processes")
+
+def time_calls(func, iterations, before=None):
+    """Per-call microseconds of `func`, running `before` untimed ahead of each call"""
+    samples = []
+    for _ in range(iterations):
+        if before is not None:
+            before()
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return {
+        "mean_us": statistics.fmean(samples),
+        "p50_us": samples[len(samples) // 2],
+        "p95_us": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+def peak_bytes(func, before=None):
+    if before is not None:
+        before()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def measure(func, iterations, before=None):
+    func()  # warm up lazily opened handles and caches
+    result = time_calls(func, iterations, before)
+    result["peak_bytes"] = peak_bytes(func, before)
+    return result
+
+def use_fixture(monitor, fixture):
+    """Point the monitor's file-backed collectors at the fixture tree"""
+    monitor.procfs = ProcStats(fixture.proc)
+    monitor.temperature_collector = SysfsTemperatureCollector(fixture.sys)
+    monitor.process_collector = ProcessCollector(monitor.procfs)
+    monitor.whole_disks = fixture.whole_disks
+    monitor.last_cpu_times = monitor.read_cpu_times()
+    monitor.last_net_io = monitor.read_network_counters()
+    monitor.last_disk_io = monitor.read_disk_counters()
+
+def bench_collectors(monitor, iterations, advance, live):
+    results = {}
+    for name, collector in monitor.collectors.items():
+        result = measure(collector, iterations, advance)
+        result["source"] = "live" if live or name not in FIXTURE_COLLECTORS else "fixture"
+        results[name] = result
+    return results
+
+def bench_tick(monitor, iterations, advance):
+    def tick():
+        monitor.update_all()
+        monitor.snapshot()
+    return measure(tick, iterations, advance)
+
+def bench_ui(monitor, iterations):
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QObject, QEvent
+    from scheduler import AlignedScheduler
+    from settings import Settings
+    from ui_main import MainWindow
+    from ui_widget import FloatingWidget
+
+    counted = {
+        QEvent.Polish: "polish",
+        QEvent.StyleChange: "style_change",
+        QEvent.Paint: "paint",
+    }
+
+    class EventCounter(QObject):
+        def __init__(self):
+            super().__init__()
+            self.counts = dict.fromkeys(counted.values(), 0)
+
+        def eventFilter(self, obj, event):
+            name = counted.get(event.type())
+            if name:
+                self.counts[name] += 1
+            return False
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    settings = Settings(tempfile.mkdtemp(prefix="aerohud_bench_"))
+    scheduler = AlignedScheduler()
+    window = MainWindow(monitor, settings)
+    widget = FloatingWidget(monitor, settings, scheduler)
+    window.show()
+    widget.show()
+    app.processEvents()
+
+    monitor.update_all()
+    base = monitor.snapshot()
+    snapshots = [
+        base.replace(cpu_usage=i * 7 % 100, ram_usage=i * 3 % 100, disk_busy=i * 11 % 100,
+                      network_download_smoothed=i * 12345.0,
+                      collected_at=base.collected_at._replace(cpu=i, ram=i, disk_io=i, network=i))
+        for i in range(64)
+    ]
+
+    def run(name, view, update, ticks):
+        counter = EventCounter()
+        app.installEventFilter(counter)
+        diff = view.display_diff
+        diff.reset_counters()
+        state = {"i": 0}
+
+        def step():
+            update(state["i"])
+            state["i"] += 1
+            app.processEvents()
+
+        result = measure(step, ticks)
+        app.removeEventFilter(counter)
+        calls = ticks + 2  # measure() adds a warm-up and a tracemalloc call
+        result.update({key: value / calls for key, value in counter.counts.items()})
+        result["label_updates"] = diff.updated / calls
+        result["label_skips"] = diff.skipped / calls
+        return result
+
+    themes = ("light", "dark")
+    results = {
+        "main_window.update_display": run(
+            "main", window, lambda i: window.update_display(snapshots[i % len(snapshots)]), iterations),
+        "floating_widget.update_display": run(
+            "widget", widget, lambda i: widget.update_display(snapshots[i % len(snapshots)]), iterations),
+        "main_window.apply_theme": run(
+            "theme", window, lambda i: window.apply_theme(themes[i % 2]), max(10, iterations // 10)),
+    }
+    widget.close()
+    window.close()
+    return results
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nchange against {baseline_path} ({baseline['meta'].get('revision')}):")
+    for section in ("collectors", "tick", "ui"):
+        old_section, new_section = baseline.get(section, {}), results[section]
+        cases = new_section.items() if section != "tick" else [("full tick", new_section)]
+        for name, new in cases:
+            old = old_section.get(name) if section != "tick" else old_section
+            if not old or not old.get("mean_us"):
+                continue
+            change = (new["mean_us"] - old["mean_us"]) / old["mean_us"] * 100
+            print(f"  {section:10} {name:34} {old['mean_us']:>10.1f} -> {new['mean_us']:>10.1f} us  {change:+6.1f}%")
+
+def print_table(results):
+    print(f"{'case':44}{'mean us':>10}{'p95 us':>10}{'peak B':>10}")
+    rows = [(f"collector {name} ({r['source']})", r) for name, r in results["collectors"].items()]
+    rows.append(("full tick", results["tick"]))
+    rows += list(results["ui"].items())
+    for name, r in rows:
+        print(f"{name:44}{r['mean_us']:>10.1f}{r['p95_us']:>10.1f}{r['peak_bytes']:>10}")
+    for name, r in results["ui"].items():
+        print(f"{name:44}polish {r['polish']:.2f}  style {r['style_change']:.2f}  "
+              f"paint {r['paint']:.2f}  labels {r['label_updates']:.2f}/tick")
+
+def main():
+    parser = argparse.ArgumentParser(description="AeroSys HUD benchmark suite")
+    parser.add_argument("--live", action="store_true", help="measure the real /proc and /sys instead of the fixture")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=2000, help="processes in the fixture")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON file from an earlier run to compare against")
+    args = parser.parse_args()
+
+    monitor = SystemMonitor()
+    advance = None
+    with tempfile.TemporaryDirectory(prefix="aerohud_fixture_") as root:
+        if not args.live:
+            fixture = Fixture(root, processes=args.processes)
+            use_fixture(monitor, fixture)
+            advance = fixture.advance
+        results = {
+            "meta": {
+                "revision": git_revision(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "source": "live" if args.live else "fixture",
+                "iterations": args.iterations,
+            },
+            "collectors": bench_collectors(monitor, args.iterations, advance, args.live),
+            "tick": bench_tick(monitor, args.iterations, advance),
+        }
+        results["ui"] = bench_ui(monitor, args.iterations)
+        if monitor.procfs is not None:
+            monitor.procfs.close()
+        monitor.temperature_collector.close()
+
+    print_table(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nresults written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Synthetic /proc and /sys trees for machine-independent collector benchmarks.
+
+The files follow the kernel formats the collectors parse. Counters move by
+fixed, deterministic steps on every advance(), so deltas and rates are
+non-zero without depending on what the benchmarking machine is doing.
+Files are rewritten in place: the collectors keep some of them open.
+"""
+import os
+
+STAT_FIELDS = ("user", "nice", "system", "idle", "iowait", "irq", "softirq", "steal")
+
+class Fixture:
+    def __init__(self, root, cores=8, processes=2000, interfaces=("lo", "eth0", "wlan0"),
+                 disks=("sda", "nvme0n1"), partitions=("sda1", "sda2", "nvme0n1p1")):
+        self.root = root
+        self.proc = os.path.join(root, "proc")
+        self.sys = os.path.join(root, "sys")
+        self.cores = cores
+        self.pids = list(range(100, 100 + processes))
+        self.interfaces = interfaces
+        self.whole_disks = set(disks)  # what /sys/block would list
+        self.disks = disks + partitions
+        self.tick = 0
+        self.build()
+
+    def build(self):
+        os.makedirs(os.path.join(self.proc, "net"), exist_ok=True)
+        for pid in self.pids:
+            os.makedirs(os.path.join(self.proc, str(pid)), exist_ok=True)
+        hwmon = os.path.join(self.sys, "class", "hwmon", "hwmon0")
+        os.makedirs(hwmon, exist_ok=True)
+        self.write(os.path.join(hwmon, "name"), "coretemp\n")
+        self.write(os.path.join(hwmon, "temp1_label"), "Package id 0\n")
+        for core in range(self.cores):
+            self.write(os.path.join(hwmon, f"temp{core + 2}_label"), f"Core {core}\n")
+        self.write_counters(all_processes=True)
+
+    def advance(self):
+        """Move every counter forward by one tick"""
+        self.tick += 1
+        self.write_counters()
+
+    def write_counters(self, all_processes=False):
+        t = self.tick
+        lines = []
+        totals = [0] * len(STAT_FIELDS)
+        per_core = []
+        for core in range(self.cores):
+            busy = (core * 13 + t * 7) % 60 + 10
+            values = [t * busy, t, t * 5, t * (100 - busy), t * 2, 0, t, 0]
+            per_core.append(values)
+            totals = [a + b for a, b in zip(totals, values)]
+        lines.append("cpu  " + " ".join(map(str, totals)) + " 0 0")
+        for core, values in enumerate(per_core):
+            lines.append(f"cpu{core} " + " ".join(map(str, values)) + " 0 0")
+        lines.append(f"intr {t * 1000}\nctxt {t * 5000}\nbtime 1700000000\nprocesses {len(self.pids)}")
+        self.write(os.path.join(self.proc, "stat"), "\n".join(lines) + "\n")
+
+        total_kb = 16 * 1024 * 1024
+        available_kb = total_kb // 2 - (t % 50) * 10240
+        self.write(os.path.join(self.proc, "meminfo"),
+                   f"MemTotal:       {total_kb} kB\nMemFree:        {available_kb // 2} kB\n"
+                   f"MemAvailable:   {available_kb} kB\nBuffers:        1024 kB\nCached:         {total_kb // 4} kB\n")
+
+        lines = [
+            "Inter-|   Receive                                                |  Transmit",
+            " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed",
+        ]
+        for i, name in enumerate(self.interfaces):
+            rx = t * (i + 1) * 125000
+            tx = t * (i + 1) * 25000
+            lines.append(f"{name:>6}: {rx} {t * 100} 0 0 0 0 0 0 {tx} {t * 50} 0 0 0 0 0 0")
+        self.write(os.path.join(self.proc, "net", "dev"), "\n".join(lines) + "\n")
+
+        lines = []
+        for i, name in enumerate(self.disks):
+            reads, writes = t * (i + 2) * 10, t * (i + 1) * 20
+            lines.append(f" 8 {i} {name} {reads} 0 {reads * 8} {t} {writes} 0 {writes * 8} {t} 0 {t * 3} {t * 4} 0 0 0 0 0 0")
+        self.write(os.path.join(self.proc, "diskstats"), "\n".join(lines) + "\n")
+
+        hwmon = os.path.join(self.sys, "class", "hwmon", "hwmon0")
+        for sensor in range(self.cores + 1):
+            self.write(os.path.join(hwmon, f"temp{sensor + 1}_input"), f"{45000 + (t + sensor) % 20 * 500}\n")
+
+        # Most processes sleep: only a rotating tenth of them accumulate CPU time
+        pids = self.pids if all_processes else self.pids[t % 10::10]
+        for pid in pids:
+            self.write_process(pid, t)
+
+    def write_process(self, pid, t):
+        cpu = t * (pid % 7)
+        fields = ["S", "1", str(pid), str(pid), "0", "-1", "4194560", "100", "0", "0", "0",
+                  str(cpu), str(cpu // 3), "0", "0", "20", "0", "1", "0", str(pid * 10),
+                  str(pid * 4096 * 3), str(pid % 5000 + 100)] + ["0"] * 30
+        base = os.path.join(self.proc, str(pid))
+        self.write(os.path.join(base, "stat"), f"{pid} (worker-{pid % 37}) " + " ".join(fields) + "\n")
+        self.write(os.path.join(base, "io"),
+                   f"rchar: {t * 4096}\nwchar: {t * 2048}\nsyscr: {t}\nsyscw: {t}\n"
+                   f"read_bytes: {t * (pid % 64) * 1024}\nwrite_bytes: {t * 512}\ncancelled_write_bytes: 0\n")
+
+    @staticmethod
+    def write(path, text):
+        # "w" truncates the existing inode, so open handles see the new content
+        with open(path, "w") as f:
+            f.write(text)
@@ -0,0 +1,139 @@
+import json
+import threading
+import time
+
+# Four sub-buckets per power of two give about 12% resolution at any
+# latency; 65 octaves cover every 64-bit nanosecond count
+SUB_BUCKETS = 4
+BUCKETS = 65 * SUB_BUCKETS
+
+# Timing a call costs about a microsecond with cold caches, more than 1% of
+# a fast tick when done on every tick. Sites marked `sampled` (the tick and
+# the collectors that run on it) are therefore timed on about one tick in
+# TIMING_EVERY, chosen at random so no collector schedule can line up with
+# or dodge the timed ticks. Their calls and errors are still counted exactly.
+TIMING_EVERY = 64
+
+def bucket_index(ns):
+    bits = ns.bit_length()
+    if bits < 3:
+        return ns
+    return bits * SUB_BUCKETS + ((ns >> (bits - 3)) & 3)
+
+def bucket_bounds(index):
+    """(low, high) nanoseconds covered by a bucket"""
+    if index < SUB_BUCKETS:
+        return index, index + 1
+    bits, sub = divmod(index, SUB_BUCKETS)
+    return (4 + sub) << (bits - 3), (5 + sub) << (bits - 3)
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram for one instrumented call site.
+
+    record() only bumps counters in a preallocated table - nothing is kept
+    per call - so it is cheap enough to stay on all the time. Percentiles
+    are read back as bucket midpoints. `calls` and `errors` are exact
+    counts kept by the call site; on a `sampled` site only some calls are
+    timed, so the percentiles come from fewer samples than calls.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.counts = [0] * BUCKETS
+        self.sampled = False
+        self.reset()
+
+    def reset(self):
+        self.counts[:] = [0] * BUCKETS
+        self.calls = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.since_ns = time.perf_counter_ns()
+
+    def record(self, started_ns, ended_ns):
+        """Add one timed call; the call itself is counted by the caller"""
+        elapsed = ended_ns - started_ns
+        # bucket_index() inlined - this runs for every timed call
+        bits = elapsed.bit_length()
+        if bits > 2:
+            self.counts[bits * SUB_BUCKETS + ((elapsed >> (bits - 3)) & 3)] += 1
+        else:
+            self.counts[elapsed] += 1
+        self.total_ns += elapsed
+        if elapsed > self.max_ns:
+            self.max_ns = elapsed
+
+    @property
+    def samples(self):
+        """Number of timed calls"""
+        return sum(self.counts)
+
+    def percentile(self, q, samples=None):
+        """Approximate q-th percentile (0-100) in nanoseconds, None before any timed call"""
+        if samples is None:
+            samples = self.samples
+        if not samples:
+            return None
+        rank = max(1, round(samples * q / 100))
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                low, high = bucket_bounds(i)
+                return min((low + high) / 2, self.max_ns)
+        return self.max_ns
+
+    def rate(self):
+        """Calls per second since the histogram was created or reset"""
+        elapsed = time.perf_counter_ns() - self.since_ns
+        return self.calls * 1e9 / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        samples = self.samples
+        p50 = self.percentile(50, samples)
+        p99 = self.percentile(99, samples)
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "errors": self.errors,
+            "rate": self.rate(),
+            "sampled": self.sampled,
+            "samples": samples,
+            "mean_us": self.total_ns / samples / 1000 if samples else None,
+            "p50_us": p50 / 1000 if p50 is not None else None,
+            "p99_us": p99 / 1000 if p99 is not None else None,
+            "max_us": self.max_ns / 1000 if samples else None,
+        }
+
+class Timings:
+    """Latency histograms by name: collectors, the sampling tick, UI updates.
+
+    Call sites look a histogram up once via histogram(name) and time with
+    time.perf_counter_ns(). Each histogram is written by a single thread;
+    readers on other threads may see a sample half applied, which is fine
+    for diagnostics.
+    """
+    def __init__(self):
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram(name))
+        return histogram
+
+    def summary(self):
+        return [self.histograms[name].summary() for name in sorted(self.histograms)]
+
+    def reset(self):
+        for histogram in list(self.histograms.values()):
+            histogram.reset()
+
+    def to_json(self):
+        return json.dumps({"timings": self.summary()}, indent=2)
+
+    def export(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
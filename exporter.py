@@ -0,0 +1,142 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+DEFAULT_PORT = 9717
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def family(lines, name, help_text, samples, unit=None):
+    """Append one gauge metric family; samples are (labels dict, value) pairs"""
+    samples = [(labels, value) for labels, value in samples if value is not None]
+    if not samples:
+        return
+    lines.append(f"# TYPE {name} gauge")
+    if unit:
+        lines.append(f"# UNIT {name} {unit}")
+    lines.append(f"# HELP {name} {help_text}")
+    for labels, value in samples:
+        if labels:
+            label_text = ",".join(f'{key}="{escape(item)}"' for key, item in labels.items())
+            lines.append(f"{name}{{{label_text}}} {number(value)}")
+        else:
+            lines.append(f"{name} {number(value)}")
+
+def render(snapshot):
+    """OpenMetrics text exposition of a Snapshot, as bytes"""
+    lines = []
+    family(lines, "aerosys_cpu_usage_percent", "Total CPU utilisation.", [({}, snapshot.cpu_usage)])
+    family(lines, "aerosys_cpu_core_usage_percent", "Per-core CPU utilisation.",
+           [({"core": i}, value) for i, value in enumerate(snapshot.cpu_per_core)])
+    family(lines, "aerosys_cpu_mode_percent", "CPU time share by mode.", [
+        ({"mode": "user"}, snapshot.cpu_user),
+        ({"mode": "system"}, snapshot.cpu_system),
+        ({"mode": "iowait"}, snapshot.cpu_iowait),
+    ])
+    family(lines, "aerosys_memory_usage_percent", "Used physical memory.", [({}, snapshot.ram_usage)])
+
+    mounts = snapshot.disk_mounts
+    family(lines, "aerosys_filesystem_usage_percent", "Used space per mounted filesystem.",
+           [({"mountpoint": m.mountpoint, "fstype": m.fstype}, m.percent) for m in mounts])
+    family(lines, "aerosys_filesystem_size_bytes", "Filesystem size.",
+           [({"mountpoint": m.mountpoint, "fstype": m.fstype}, m.total) for m in mounts], "bytes")
+    family(lines, "aerosys_filesystem_used_bytes", "Used filesystem space.",
+           [({"mountpoint": m.mountpoint, "fstype": m.fstype}, m.used) for m in mounts], "bytes")
+
+    disks = snapshot.disk_devices
+    family(lines, "aerosys_disk_read_bytes_per_second", "Disk read throughput.",
+           [({"device": d.name}, d.read) for d in disks])
+    family(lines, "aerosys_disk_write_bytes_per_second", "Disk write throughput.",
+           [({"device": d.name}, d.write) for d in disks])
+    family(lines, "aerosys_disk_reads_per_second", "Completed disk reads per second.",
+           [({"device": d.name}, d.read_iops) for d in disks])
+    family(lines, "aerosys_disk_writes_per_second", "Completed disk writes per second.",
+           [({"device": d.name}, d.write_iops) for d in disks])
+    family(lines, "aerosys_disk_busy_percent", "Share of time the disk had I/O in flight.",
+           [({"device": d.name}, d.busy) for d in disks])
+
+    interfaces = snapshot.network_interfaces
+    family(lines, "aerosys_network_receive_bytes_per_second", "Network download throughput.",
+           [({"interface": i.name}, i.download) for i in interfaces])
+    family(lines, "aerosys_network_transmit_bytes_per_second", "Network upload throughput.",
+           [({"interface": i.name}, i.upload) for i in interfaces])
+
+    family(lines, "aerosys_temperature_celsius", "CPU temperature per sensor.",
+           [({"sensor": f"package{i}"}, value) for i, value in enumerate(snapshot.temperature_packages)]
+           + [({"sensor": f"core{i}"}, value) for i, value in enumerate(snapshot.temperature_cores)],
+           "celsius")
+    family(lines, "aerosys_battery_percent", "Battery charge.", [({}, snapshot.battery_level)])
+    family(lines, "aerosys_hud_cpu_percent", "CPU used by AeroSys HUD itself, as a share of one core.",
+           [({}, snapshot.hud_cpu)])
+    family(lines, "aerosys_hud_resident_memory_bytes", "Resident memory of AeroSys HUD itself.",
+           [({}, snapshot.hud_rss)], "bytes")
+    family(lines, "aerosys_sample_interval_seconds", "Current refresh interval of the fast metrics.",
+           [({}, snapshot.update_interval)], "seconds")
+    lines.append("# EOF\n")
+    return "\n".join(lines).encode("utf-8")
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so frequent scrapers reuse one connection
+    wbufsize = -1  # headers and body leave in one send, no delayed-ACK stall
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.exporter.body()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class MetricsExporter:
+    """Serves the latest snapshot at http://host:port/metrics.
+
+    publish() is a sampler listener and only stores the snapshot. The text
+    is rendered on the first scrape after a new snapshot and the encoded
+    bytes are reused until the next one, so scrapes never touch psutil and
+    nothing is rendered while nobody scrapes.
+    """
+    # Metrics the exposition draws from - collected while the endpoint is
+    # enabled, even with every window hidden
+    METRICS = ("cpu", "ram", "disk", "disk_io", "network", "temperature", "battery", "overhead")
+    
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self.snapshot = None
+        self.encoded = b"# EOF\n"
+        self.dirty = False
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self.server.daemon_threads = True
+        self.server.exporter = self
+        self.thread = threading.Thread(target=self.server.serve_forever, name="AeroSysExporter", daemon=True)
+
+    @property
+    def address(self):
+        return self.server.server_address
+
+    def start(self):
+        self.thread.start()
+
+    def publish(self, snapshot):
+        self.snapshot = snapshot
+        self.dirty = True
+
+    def body(self):
+        with self.lock:
+            if self.dirty:
+                self.dirty = False
+                self.encoded = render(self.snapshot)
+            return self.encoded
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,139 @@
+import argparse
+import json
+import signal
+import sys
+import threading
+import time
+
+from sampler import Sampler, DemandTracker
+from system_monitor import SystemMonitor, COLLECTION_SCHEDULES
+
+def plain(value):
+    """Nested namedtuples/tuples as dicts/lists so json can encode them"""
+    if hasattr(value, "_asdict"):
+        return {field: plain(item) for field, item in zip(value._fields, value)}
+    if isinstance(value, tuple):
+        return [plain(item) for item in value]
+    return value
+
+def snapshot_to_json(snapshot):
+    record = {"timestamp": round(time.time(), 3)}
+    record.update((field, plain(value)) for field, value in snapshot.as_dict().items())
+    return json.dumps(record, separators=(",", ":"))
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="main.py --headless",
+        description="Collect system metrics without a GUI and stream them as JSON lines.",
+    )
+    parser.add_argument("--mode", default="balanced", choices=list(COLLECTION_SCHEDULES) + ["adaptive"],
+                        help="performance profile setting the collection schedule (default: balanced)")
+    parser.add_argument("--interval", type=float,
+                        help="write one line every INTERVAL seconds and collect the profile's fast metrics at that rate")
+    parser.add_argument("--output", help="append JSON lines to this file instead of stdout")
+    parser.add_argument("--metrics", help="comma separated collectors to run (default: all)")
+    parser.add_argument("--listen", metavar="[HOST:]PORT",
+                        help="serve OpenMetrics at http://HOST:PORT/metrics (host defaults to 127.0.0.1, e.g. 9717)")
+    parser.add_argument("--quiet", action="store_true", help="don't write JSON lines (useful with --listen)")
+    parser.add_argument("--record", metavar="FILE", help="also write every snapshot to a binary log for replay")
+    parser.add_argument("--diagnostics", metavar="FILE", help="write per-collector timings as JSON to FILE on exit")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    monitor = SystemMonitor(args.mode)
+    metrics = tuple(monitor.collectors)
+    if args.metrics:
+        metrics = tuple(name.strip() for name in args.metrics.split(","))
+        unknown = set(metrics) - set(monitor.collectors)
+        if unknown:
+            print(f"Unknown metrics: {', '.join(sorted(unknown))}", file=sys.stderr)
+            return 2
+
+    demand = DemandTracker()
+    demand.register("headless", metrics, active=True)
+    sampler = Sampler(monitor, demand)
+    interval = None
+    if args.interval:
+        interval = max(0.1, args.interval)
+        if args.mode == "adaptive":
+            # A fixed rate is the adaptive schedule with floor == ceiling
+            sampler.adaptive.set_bounds(interval, interval)
+            monitor.set_adaptive_interval(interval)
+        else:
+            monitor.set_fast_interval(interval)
+
+    exporter = None
+    if args.listen:
+        # Imported here: http.server is a noticeable part of start-up
+        from exporter import MetricsExporter
+        host, _, port = args.listen.rpartition(":")
+        try:
+            exporter = MetricsExporter(host or "127.0.0.1", int(port))
+        except (OSError, ValueError) as e:
+            print(f"Cannot listen on {args.listen}: {e}", file=sys.stderr)
+            return 2
+        sampler.add_listener(exporter.publish)
+        exporter.start()
+
+    recorder = None
+    if args.record:
+        from replay import SnapshotRecorder
+        try:
+            recorder = SnapshotRecorder(args.record)
+        except OSError as e:
+            print(f"Cannot record to {args.record}: {e}", file=sys.stderr)
+            return 2
+        sampler.add_listener(recorder.write)
+
+    output = None
+    if not args.quiet:
+        output = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout
+    stop = threading.Event()
+
+    def write(snapshot):
+        try:
+            output.write(snapshot_to_json(snapshot) + "\n")
+            output.flush()
+        except (OSError, ValueError):
+            # Reader went away (closed pipe) - shut down quietly
+            stop.set()
+
+    def request_stop(signum, frame):
+        stop.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    if output is not None and interval is None:
+        sampler.add_listener(write)
+    sampler.start()
+    try:
+        if output is not None and interval is not None:
+            # Slower metrics publish snapshots of their own; a fixed rate
+            # means writing the latest values on our own cadence instead
+            next_line = time.monotonic() + interval
+            while not stop.wait(max(0.0, next_line - time.monotonic())):
+                write(sampler.latest())
+                next_line = max(next_line + interval, time.monotonic())
+        while not stop.wait(1.0):
+            pass
+    finally:
+        sampler.stop()
+        sampler.join(2.0)
+        if exporter is not None:
+            exporter.stop()
+        if recorder is not None:
+            recorder.close()
+        if output not in (None, sys.stdout):
+            output.close()
+        if args.diagnostics:
+            try:
+                monitor.timings.export(args.diagnostics)
+            except OSError as e:
+                print(f"Failed to write diagnostics: {e}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
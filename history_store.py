@@ -0,0 +1,239 @@
+import math
+import mmap
+import os
+import struct
+import threading
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional - fall back to memoryview columns
+    np = None
+
+MAGIC = b"AEROHIST"
+VERSION = 1
+# magic, version, capacity, period, head, count
+HEADER = struct.Struct("<8sIIIII")
+# Header plus field names, padded so the columns start page-aligned
+HEADER_SIZE = 4096
+
+# (name, bucket seconds, capacity): 1 s for 24 h, 1 min for 30 days, 1 h for a year
+TIERS = (
+    ("raw", 1, 24 * 60 * 60),
+    ("minute", 60, 30 * 24 * 60),
+    ("hour", 60 * 60, 365 * 24),
+)
+
+
+class HistoryFile:
+    """One rollup tier: a preallocated ring of samples in a memory-mapped file.
+
+    After a 4 KiB header (capacity, period, head, count and field names)
+    come a uint32 column of Unix seconds and one float32 column per field,
+    each `capacity` long. Missing values are NaN. The file never grows, and
+    because every column is contiguous, range queries are views straight
+    into the mapping - nothing is read that the query does not cover.
+
+    A file whose layout does not match `fields`/`capacity`/`period` is
+    recreated empty.
+    """
+    def __init__(self, path, fields, capacity, period):
+        self.path = path
+        self.fields = list(fields)
+        self.capacity = capacity
+        self.period = period
+        self.size = HEADER_SIZE + 4 * capacity * (len(self.fields) + 1)
+
+        names = "\n".join(self.fields).encode("utf-8")
+        if HEADER.size + len(names) > HEADER_SIZE:
+            raise ValueError("too many fields for the history header")
+
+        self.file = None
+        if os.path.exists(path) and os.path.getsize(path) == self.size:
+            self.file = open(path, "r+b")
+            header = self.file.read(HEADER_SIZE)
+            magic, version, capacity, period, head, count = HEADER.unpack_from(header)
+            stored = header[HEADER.size:HEADER.size + len(names)]
+            if (magic, version, capacity, period, stored) != (MAGIC, VERSION, self.capacity, self.period, names):
+                self.file.close()
+                self.file = None
+        if self.file is None:
+            head = count = 0
+            self.file = open(path, "w+b")
+            self.file.truncate(self.size)
+            self.file.write(HEADER.pack(MAGIC, VERSION, self.capacity, self.period, 0, 0) + names)
+            self.file.flush()
+
+        self.map = mmap.mmap(self.file.fileno(), self.size)
+        self.head = head
+        self.count = min(count, self.capacity)
+        self.times = self.column(0, "I")
+        self.columns = {field: self.column(i + 1, "f") for i, field in enumerate(self.fields)}
+
+    def column(self, index, typecode):
+        offset = HEADER_SIZE + 4 * self.capacity * index
+        if np is not None:
+            dtype = np.uint32 if typecode == "I" else np.float32
+            return np.frombuffer(self.map, dtype=dtype, count=self.capacity, offset=offset)
+        return memoryview(self.map)[offset:offset + 4 * self.capacity].cast(typecode)
+
+    def append(self, timestamp, values):
+        """Write one row; `values` maps field -> float, absent fields are NaN"""
+        timestamp = int(timestamp)
+        if self.count:
+            # Keep the column sorted for binary search across clock steps
+            timestamp = max(timestamp, int(self.times[(self.head - 1) % self.capacity]))
+        self.times[self.head] = timestamp
+        for field, column in self.columns.items():
+            column[self.head] = values.get(field, math.nan)
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, self.capacity, self.period, self.head, self.count)
+
+    def _physical(self, logical):
+        return (self.head - self.count + logical) % self.capacity
+
+    def _first_at_or_after(self, timestamp):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.times[self._physical(mid)] < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def segments(self, field, start=None, end=None):
+        """Return [(times, values), ...] views of rows with start <= time < end.
+
+        The oldest segment comes first. Views alias the mapping, so copy
+        them before the writer wraps around onto them.
+        """
+        first = 0 if start is None else self._first_at_or_after(int(start))
+        last = self.count if end is None else self._first_at_or_after(int(math.ceil(end)))
+        if first >= last:
+            return []
+        values = self.columns[field]
+        a = self._physical(first)
+        b = self._physical(last - 1) + 1
+        if a < b:
+            return [(self.times[a:b], values[a:b])]
+        return [(self.times[a:], values[a:]), (self.times[:b], values[:b])]
+
+    def flush(self):
+        self.map.flush()
+
+    def close(self):
+        self.times = None
+        self.columns = {}
+        self.map.flush()
+        try:
+            self.map.close()
+        except BufferError:
+            pass  # a caller still holds a view; the mapping goes with it
+        self.file.close()
+
+
+class PersistentHistory:
+    """Metric history that survives restarts, rolled up into TIERS.
+
+    add() accumulates samples per tier; when a sample falls into a new
+    bucket, the finished bucket's mean is written to that tier's file.
+    Queries pick the finest tier that still covers the requested range.
+    """
+    def __init__(self, directory, fields, tiers=TIERS):
+        os.makedirs(directory, exist_ok=True)
+        self.fields = list(fields)
+        self.index = {field: i for i, field in enumerate(self.fields)}
+        self.tiers = [
+            HistoryFile(os.path.join(directory, f"{name}.bin"), self.fields, capacity, period)
+            for name, period, capacity in tiers
+        ]
+        # Per tier: [bucket number, sums, counts] of the bucket being filled
+        self.pending = [[None, [0.0] * len(self.fields), [0] * len(self.fields)] for _ in self.tiers]
+        self.lock = threading.Lock()
+
+    def add(self, field, value, timestamp):
+        """Accumulate one sample taken at `timestamp` (time.time())"""
+        i = self.index.get(field)
+        if i is None:
+            return
+        with self.lock:
+            for tier, pending in zip(self.tiers, self.pending):
+                bucket = int(timestamp // tier.period)
+                if bucket != pending[0]:
+                    self._write(tier, pending)
+                    pending[0] = bucket
+                pending[1][i] += value
+                pending[2][i] += 1
+
+    def _write(self, tier, pending):
+        bucket, sums, counts = pending
+        if bucket is not None and any(counts):
+            tier.append(bucket * tier.period, {
+                field: sums[i] / counts[i] for field, i in self.index.items() if counts[i]
+            })
+        pending[1] = [0.0] * len(self.fields)
+        pending[2] = [0] * len(self.fields)
+
+    def tier_for(self, seconds):
+        """Finest tier whose retention covers the last `seconds`"""
+        for tier in self.tiers:
+            if tier.period * tier.capacity >= seconds:
+                return tier
+        return self.tiers[-1]
+
+    def series(self, field, seconds, points, now):
+        """Means of `field` over the last `seconds` in `points` equal buckets.
+
+        `now` is a time.time() value. Buckets without data are None.
+        """
+        start = now - seconds
+        tier = self.tier_for(seconds)
+        with self.lock:
+            parts = tier.segments(field, start, now)
+            if np is not None:
+                times = np.concatenate([t for t, _ in parts]) if parts else np.empty(0, np.uint32)
+                values = np.concatenate([v for _, v in parts]) if parts else np.empty(0, np.float32)
+            else:
+                times = array("I")
+                values = array("f")
+                for t, v in parts:
+                    times.extend(t)
+                    values.extend(v)
+        return downsample(times, values, start, seconds, points)
+
+    def flush(self):
+        with self.lock:
+            for tier in self.tiers:
+                tier.flush()
+
+    def close(self):
+        """Write the partially filled buckets and unmap the files"""
+        with self.lock:
+            for tier, pending in zip(self.tiers, self.pending):
+                self._write(tier, pending)
+                pending[0] = None
+                tier.close()
+
+
+def downsample(times, values, start, seconds, points):
+    """Average (times, values) into `points` buckets spanning `seconds` from `start`"""
+    if np is not None:
+        times = np.asarray(times, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        slots = ((times - start) * points // seconds).astype(np.int64)
+        keep = (slots >= 0) & (slots < points) & ~np.isnan(values)
+        sums = np.bincount(slots[keep], weights=values[keep], minlength=points)
+        counts = np.bincount(slots[keep], minlength=points)
+        return [float(s / c) if c else None for s, c in zip(sums, counts)]
+
+    sums = [0.0] * points
+    counts = [0] * points
+    for t, v in zip(times, values):
+        slot = int((t - start) * points // seconds)
+        if 0 <= slot < points and v == v:  # v != v only for NaN
+            sums[slot] += v
+            counts[slot] += 1
+    return [s / c if c else None for s, c in zip(sums, counts)]
@@ -1,12 +1,38 @@
 import sys
+
+# The headless collector must never import Qt, so dispatch to it before the
+# GUI imports below
+if __name__ == "__main__" and "--headless" in sys.argv[1:]:
+    from headless import main
+    sys.exit(main([arg for arg in sys.argv[1:] if arg != "--headless"]))
+
+import argparse
 import os
-from PyQt5.QtWidgets import QApplication, QMainWindow, QSystemTrayIcon, QMenu, QAction, QStyle, QSlider, QLabel, QVBoxLayout, QDialog, QHBoxLayout
+import datetime
+import time
+from PyQt5.QtWidgets import QApplication, QMainWindow, QSystemTrayIcon, QMenu, QAction, QActionGroup, QStyle, QSlider, QLabel, QVBoxLayout, QDialog, QHBoxLayout
 from PyQt5.QtGui import QIcon, QPixmap, QMouseEvent
-from PyQt5.QtCore import QTimer, Qt, QPoint, QSize
+from PyQt5.QtCore import Qt, QPoint, QSize, QObject, QEvent, pyqtSignal
 from ui_main import MainWindow
 from ui_widget import FloatingWidget
-from system_monitor import SystemMonitor
+from system_monitor import SystemMonitor, NUMERIC_FIELDS, NUMERIC_FIELD_NAMES, HISTORY_FIELD_NAMES
+from alerts import AlertEngine, load_rules
+from overhead import OverheadBudget, cheaper_mode
+from history_store import PersistentHistory
+from sampler import Sampler, DemandTracker
+from scheduler import AlignedScheduler
 from settings import Settings
+from exporter import MetricsExporter
+from ui_diagnostics import DiagnosticsPanel
+from ui_replay import ReplayPlayer
+from replay import SnapshotRecorder, read_log
+
+class SnapshotBridge(QObject):
+    """Carries snapshots from the sampler thread onto the GUI thread"""
+    snapshot_ready = pyqtSignal(object)
+    wakeup_ready = pyqtSignal(object)
+    alert_ready = pyqtSignal(object)
+    overhead_exceeded = pyqtSignal(object)
 
 class SettingsDialog(QDialog):
     def __init__(self, parent=None):
@@ -68,10 +94,11 @@ class SettingsDialog(QDialog):
         """)
 
 class AeroSysHUD(QMainWindow):
-    def __init__(self):
+    def __init__(self, live=True):
         super().__init__()
         self.settings = Settings()
-        self.system_monitor = SystemMonitor()
+        self.history_store = self.open_history_store()
+        self.system_monitor = SystemMonitor(self.settings.performance_mode, history_store=self.history_store)
         
         # Set application icon
         self.set_application_icon()
@@ -82,7 +109,8 @@ class AeroSysHUD(QMainWindow):
         # Set up main window
         self.setCentralWidget(self.main_window)
         self.setWindowTitle("AeroSys HUD")
-        self.setGeometry(100, 100, 300, 400)
+        x, y = self.settings.main_window_position
+        self.setGeometry(x, y, 300, 400)
         self.setMinimumSize(250, 350)
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
         self.setAttribute(Qt.WA_TranslucentBackground)
@@ -94,15 +122,63 @@ class AeroSysHUD(QMainWindow):
         # System tray
         self.setup_tray()
         
-        # Update timer
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_data)
-        self.update_timer.start(1000)
+        # One second-aligned timer drives the clock, auto-hide and sampling
+        self.scheduler = AlignedScheduler(self)
+        
+        # Background sampling - the GUI thread only receives finished snapshots
+        self.snapshot = self.system_monitor.snapshot()
+        self.snapshot_bridge = SnapshotBridge()
+        self.snapshot_bridge.snapshot_ready.connect(self.update_data, Qt.QueuedConnection)
+        self.snapshot_bridge.wakeup_ready.connect(self.schedule_sampling, Qt.QueuedConnection)
+        self.demand = DemandTracker()
+        self.demand.register("main_window", MainWindow.METRICS)
+        self.demand.register("floating_widget", FloatingWidget.METRICS)
+        self.sampler = Sampler(self.system_monitor, self.demand, self_timed=False)
+        self.sampler.adaptive.set_bounds(self.settings.adaptive_min_interval, self.settings.adaptive_max_interval)
+        self.sampler.add_listener(self.snapshot_bridge.snapshot_ready.emit)
+        self.sampler.add_cycle_listener(self.snapshot_bridge.wakeup_ready.emit)
+        timings = self.system_monitor.timings
+        self.main_window_timing = timings.histogram("ui.main_window") if timings is not None else None
+        self.widget_timing = timings.histogram("ui.floating_widget") if timings is not None else None
+        
+        # Alert rules run on the sampler thread; notifications on the GUI thread
+        self.alert_engine = AlertEngine(load_rules(self.settings.alert_rules, NUMERIC_FIELD_NAMES))
+        self.alert_engine.on_alert = self.snapshot_bridge.alert_ready.emit
+        self.snapshot_bridge.alert_ready.connect(self.show_alert, Qt.QueuedConnection)
+        self.set_alerts_active(self.settings.alerts_enabled)
+        
+        # Our own CPU use is checked on the sampler thread; the profile is
+        # stepped down on the GUI thread
+        self.overhead_budget = OverheadBudget(self.settings.overhead_cpu_budget)
+        self.overhead_budget.on_exceeded = self.snapshot_bridge.overhead_exceeded.emit
+        self.snapshot_bridge.overhead_exceeded.connect(self.reduce_overhead, Qt.QueuedConnection)
+        self.set_overhead_budget_active(self.settings.overhead_budget_enabled)
+        self.demand.add_listener(self.update_budget_demand)
+        
+        # Without live data (replay) the sampler thread is never started
+        if live:
+            self.sampler.start()
+        self.recorder = None
+        self.replay_player = None
+        
+        # Optional OpenMetrics endpoint fed by the same snapshots
+        self.exporter = None
+        if self.settings.metrics_endpoint:
+            self.start_exporter()
         
         # Apply initial settings
         self.apply_theme()
         self.update_overlay_mode(self.settings.overlay_mode)
         
+    def open_history_store(self):
+        """On-disk metric history next to the settings file, None if unavailable"""
+        directory = os.path.join(self.settings.config_dir, "history")
+        try:
+            return PersistentHistory(directory, HISTORY_FIELD_NAMES)
+        except (OSError, ValueError) as e:
+            print(f"Failed to open metric history: {e}")
+            return None
+            
     def set_application_icon(self):
         """Set the application icon from file or embedded resource"""
         icon_path = self.get_icon_path()
@@ -152,6 +228,10 @@ class AeroSysHUD(QMainWindow):
         self.overlay_action.triggered.connect(self.toggle_overlay_mode)
         view_menu.addAction(self.overlay_action)
         
+        diagnostics_action = QAction("Diagnostics", self)
+        diagnostics_action.triggered.connect(self.show_diagnostics)
+        view_menu.addAction(diagnostics_action)
+        
         tray_menu.addMenu(view_menu)
         
         # Settings Menu
@@ -162,6 +242,21 @@ class AeroSysHUD(QMainWindow):
         startup_action.triggered.connect(self.toggle_startup)
         settings_menu.addAction(startup_action)
         
+        self.metrics_action = QAction(f"Metrics Endpoint (:{self.settings.metrics_port})", self, checkable=True)
+        self.metrics_action.setChecked(self.settings.metrics_endpoint)
+        self.metrics_action.triggered.connect(self.toggle_metrics_endpoint)
+        settings_menu.addAction(self.metrics_action)
+        
+        alerts_action = QAction("Alerts", self, checkable=True)
+        alerts_action.setChecked(self.settings.alerts_enabled)
+        alerts_action.triggered.connect(self.toggle_alerts)
+        settings_menu.addAction(alerts_action)
+        
+        budget_action = QAction(f"Overhead Budget ({self.settings.overhead_cpu_budget:g}% CPU)", self, checkable=True)
+        budget_action.setChecked(self.settings.overhead_budget_enabled)
+        budget_action.triggered.connect(self.toggle_overhead_budget)
+        settings_menu.addAction(budget_action)
+        
         theme_action = QAction("Toggle Theme", self)
         theme_action.triggered.connect(self.toggle_theme)
         settings_menu.addAction(theme_action)
@@ -181,9 +276,20 @@ class AeroSysHUD(QMainWindow):
         high_perf_action.setChecked(self.settings.performance_mode == "high_performance")
         high_perf_action.triggered.connect(lambda: self.set_performance_mode("high_performance"))
         
-        performance_menu.addAction(balanced_action)
-        performance_menu.addAction(low_power_action)
-        performance_menu.addAction(high_perf_action)
+        adaptive_action = QAction("Adaptive", self, checkable=True)
+        adaptive_action.setChecked(self.settings.performance_mode == "adaptive")
+        adaptive_action.triggered.connect(lambda: self.set_performance_mode("adaptive"))
+        
+        self.performance_actions = {
+            "balanced": balanced_action,
+            "low_power": low_power_action,
+            "high_performance": high_perf_action,
+            "adaptive": adaptive_action,
+        }
+        performance_group = QActionGroup(self)
+        for action in self.performance_actions.values():
+            performance_group.addAction(action)
+            performance_menu.addAction(action)
         settings_menu.addMenu(performance_menu)
         
         # Widget Settings Submenu
@@ -234,17 +340,32 @@ class AeroSysHUD(QMainWindow):
         
     def toggle_widget(self):
         if not hasattr(self, 'floating_widget') or not self.floating_widget:
-            self.floating_widget = FloatingWidget(self.system_monitor, self.settings)
+            self.floating_widget = FloatingWidget(self.system_monitor, self.settings, self.scheduler)
             self.floating_widget.on_show_full_app = self.show_main_window
             self.floating_widget.on_widget_closed = lambda: setattr(self, 'floating_widget', None)
+            self.floating_widget.on_visibility_changed = self.set_widget_demand
+            self.floating_widget.on_hover_changed = self.sampler.set_user_present
             self.update_widget_settings()
+            self.floating_widget.update_display(self.snapshot)
+            self.floating_widget.update_clock(datetime.datetime.now())
             self.floating_widget.show()
+            # The widget may already have shown itself before the callback was attached
+            self.set_widget_demand(self.floating_widget.isVisible())
         else:
             if self.floating_widget.isVisible():
                 self.floating_widget.hide()
             else:
                 self.floating_widget.show()
                 
+    def show_diagnostics(self):
+        if self.system_monitor.timings is None:
+            return
+        if not hasattr(self, 'diagnostics_panel'):
+            self.diagnostics_panel = DiagnosticsPanel(self.system_monitor.timings, self.settings.config_dir)
+            self.diagnostics_panel.apply_theme(self.settings.theme)
+        self.diagnostics_panel.show()
+        self.diagnostics_panel.raise_()
+        
     def update_widget_settings(self):
         """Apply current settings to widget"""
         if hasattr(self, 'floating_widget') and self.floating_widget:
@@ -255,6 +376,119 @@ class AeroSysHUD(QMainWindow):
     def toggle_startup(self):
         self.settings.toggle_startup()
         
+    def toggle_metrics_endpoint(self):
+        if self.settings.toggle_metrics_endpoint():
+            self.start_exporter()
+            if self.exporter is None:
+                # Port unavailable - don't keep retrying on every launch
+                self.settings.toggle_metrics_endpoint()
+        else:
+            self.stop_exporter()
+        self.metrics_action.setChecked(self.exporter is not None)
+        
+    def start_exporter(self):
+        try:
+            self.exporter = MetricsExporter(port=self.settings.metrics_port)
+        except OSError as e:
+            print(f"Failed to start metrics endpoint: {e}")
+            self.exporter = None
+            return
+        self.exporter.publish(self.sampler.latest())
+        self.exporter.start()
+        self.sampler.add_listener(self.exporter.publish)
+        self.demand.register("exporter", MetricsExporter.METRICS, active=True)
+        
+    def stop_exporter(self):
+        if self.exporter is None:
+            return
+        self.demand.unregister("exporter")
+        self.sampler.remove_listener(self.exporter.publish)
+        self.exporter.stop()
+        self.exporter = None
+        
+    def toggle_alerts(self):
+        self.set_alerts_active(self.settings.toggle_alerts())
+        
+    def set_alerts_active(self, active):
+        """Alerts keep their metrics collected even with every window hidden"""
+        self.system_monitor.alert_engine = self.alert_engine if active else None
+        if active:
+            fields = {rule.metric for rule in self.alert_engine.rules()}
+            collectors = [name for name, names in NUMERIC_FIELDS.items() if fields.intersection(names)]
+            self.demand.register("alerts", collectors, active=True)
+        else:
+            self.demand.unregister("alerts")
+            
+    def show_alert(self, event):
+        rule = event.rule
+        value = f"{event.value:+.2f}/s" if rule.rate else f"{event.value:.1f}"
+        if event.state == "firing":
+            self.tray_icon.showMessage("AeroSys HUD", f"{rule.name}: {rule.metric} {value}", QSystemTrayIcon.Warning, 5000)
+        if self.settings.alert_log:
+            stamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            try:
+                with open(os.path.join(self.settings.config_dir, "alerts.log"), "a", encoding="utf-8") as f:
+                    f.write(f"{stamp} {event.state.upper()} {rule.name} {rule.metric}={value}\n")
+            except OSError as e:
+                print(f"Failed to write alert log: {e}")
+        
+    def toggle_overhead_budget(self):
+        active = self.settings.toggle_overhead_budget()
+        self.set_overhead_budget_active(active)
+        if not active:
+            self.restore_profile()
+        
+    def set_overhead_budget_active(self, active):
+        self.system_monitor.overhead_budget = self.overhead_budget if active else None
+        if active:
+            self.demand.register("overhead_budget", ("overhead",))
+            self.update_budget_demand()
+        else:
+            self.demand.unregister("overhead_budget")
+            
+    def update_budget_demand(self):
+        """The budget samples our own usage only while something else is collected"""
+        if self.system_monitor.overhead_budget is not None:
+            self.demand.set_active("overhead_budget", self.demand.others_active("overhead_budget"))
+            
+    def reduce_overhead(self, usage):
+        """Step down to a cheaper profile after running over the CPU budget.
+        
+        Only the running sampler changes; the saved profile comes back on
+        the next start, when a profile is picked from the tray or when the
+        budget is switched off.
+        """
+        mode = self.system_monitor.performance_mode
+        adaptive = self.sampler.adaptive
+        if mode == "adaptive" and adaptive.floor < adaptive.ceiling:
+            floor = min(adaptive.ceiling, adaptive.floor * 2)
+            adaptive.set_bounds(floor, adaptive.ceiling)
+            change = f"adaptive refresh limited to {floor:g}s"
+        else:
+            cheaper = cheaper_mode(mode)
+            if cheaper is None:
+                return
+            self.sampler.set_mode(cheaper)
+            self.performance_actions[cheaper].setChecked(True)
+            change = f"switched to {self.performance_actions[cheaper].text()}"
+        message = f"Using {usage:.1f}% CPU, budget {self.overhead_budget.cpu_percent:g}%: {change}"
+        self.tray_icon.showMessage("AeroSys HUD", message, QSystemTrayIcon.Information, 5000)
+        
+    def start_recording(self, path):
+        """Append every new snapshot to a binary log at `path`"""
+        self.recorder = SnapshotRecorder(path)
+        self.sampler.add_listener(self.recorder.write)
+        
+    def start_replay(self, path, speed=1.0):
+        """Show the snapshots recorded in `path`; speed None plays as fast as possible"""
+        records = read_log(path)
+        self.replay_player = ReplayPlayer(records, self.update_data, speed, self)
+        self.replay_player.finished.connect(self.replay_finished)
+        self.replay_player.start()
+        
+    def replay_finished(self, frames, fps):
+        print(f"Replayed {frames} snapshots at {fps:.1f} fps")
+        
     def toggle_overlay_mode(self):
         new_mode = self.settings.toggle_overlay_mode()
         self.update_overlay_mode(new_mode)
@@ -281,12 +515,15 @@ class AeroSysHUD(QMainWindow):
             
     def set_performance_mode(self, mode):
         self.settings.set_performance_mode(mode)
-        if mode == "low_power":
-            self.update_timer.setInterval(3000)  # Update every 3 seconds
-        elif mode == "high_performance":
-            self.update_timer.setInterval(500)   # Update every 0.5 seconds
-        else:
-            self.update_timer.setInterval(1000)  # Default 1 second
+        self.restore_profile()
+        
+    def restore_profile(self):
+        """Run the saved profile again, undoing overhead budget step-downs"""
+        mode = self.settings.performance_mode
+        self.sampler.adaptive.set_bounds(self.settings.adaptive_min_interval, self.settings.adaptive_max_interval)
+        self.sampler.set_mode(mode)
+        if mode in self.performance_actions:
+            self.performance_actions[mode].setChecked(True)
             
     def toggle_auto_hide(self):
         enabled = self.settings.toggle_auto_hide()
@@ -312,16 +549,105 @@ class AeroSysHUD(QMainWindow):
         self.main_window.apply_theme(theme)
         if hasattr(self, 'floating_widget') and self.floating_widget:
             self.floating_widget.apply_theme(theme)
+        if hasattr(self, 'diagnostics_panel'):
+            self.diagnostics_panel.apply_theme(theme)
+        
+    def update_main_demand(self):
+        """Main window needs data only while shown and not minimized"""
+        self.demand.set_active("main_window", self.main_window_active())
+        self.update_clock_job()
+        
+    def set_widget_demand(self, visible):
+        self.demand.set_active("floating_widget", visible)
+        self.update_clock_job()
+        
+    def main_window_active(self):
+        return self.isVisible() and not self.isMinimized()
+        
+    def widget_active(self):
+        return bool(getattr(self, 'floating_widget', None)) and self.floating_widget.isVisible()
         
-    def update_data(self):
-        self.system_monitor.update_all()
-        self.main_window.update_display()
-        if hasattr(self, 'floating_widget') and self.floating_widget and self.floating_widget.isVisible():
-            self.floating_widget.update_display()
+    def update_clock_job(self):
+        """Tick the clock on second edges only while some view shows it"""
+        if self.main_window_active() or self.widget_active():
+            self.scheduler.every("clock", 1, self.update_clock)
+            self.update_clock()
+        else:
+            self.scheduler.cancel("clock")
+            
+    def update_clock(self):
+        now = datetime.datetime.now()
+        if self.main_window_active():
+            self.main_window.update_clock(now)
+        if self.widget_active():
+            self.floating_widget.update_clock(now)
+            
+    def schedule_sampling(self, wakeup):
+        """Queue the sampler's next aligned collection on the shared timer"""
+        if wakeup is None:
+            self.scheduler.cancel("sample")
+        else:
+            self.scheduler.at("sample", wakeup, self.sampler.wake)
+        
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_main_demand()
+        
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_main_demand()
+        
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self.update_main_demand()
+        
+    def enterEvent(self, event):
+        self.sampler.set_user_present(True)
+        
+    def leaveEvent(self, event):
+        self.sampler.set_user_present(False)
+        
+    def update_data(self, snapshot):
+        self.snapshot = snapshot
+        if self.main_window_active():
+            started = time.perf_counter_ns()
+            self.main_window.update_display(snapshot)
+            if self.main_window_timing is not None:
+                self.main_window_timing.calls += 1
+                self.main_window_timing.record(started, time.perf_counter_ns())
+        if self.widget_active():
+            started = time.perf_counter_ns()
+            self.floating_widget.update_display(snapshot)
+            if self.widget_timing is not None:
+                self.widget_timing.calls += 1
+                self.widget_timing.record(started, time.perf_counter_ns())
+            
+    def repaint_stats(self):
+        """Combined label update/skip counters of all visible views"""
+        stats = {"main_window": self.main_window.display_diff.stats()}
+        if hasattr(self, 'floating_widget') and self.floating_widget:
+            stats["floating_widget"] = self.floating_widget.display_diff.stats()
+        return stats
             
     def quit_app(self):
+        self.stop_exporter()
+        self.sampler.stop()
+        if self.sampler.is_alive():
+            self.sampler.join(1.0)
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.replay_player is not None:
+            self.replay_player.stop()
+        if self.history_store is not None:
+            self.history_store.close()
+        self.settings.flush()
+        self.scheduler.cancel("clock")
+        self.scheduler.cancel("sample")
         if hasattr(self, 'floating_widget') and self.floating_widget:
             self.floating_widget.close()
+        if hasattr(self, 'diagnostics_panel'):
+            self.diagnostics_panel.close()
         QApplication.quit()
 
     # Dragging functionality for main window
@@ -334,19 +660,48 @@ class AeroSysHUD(QMainWindow):
     def mouseMoveEvent(self, event: QMouseEvent):
         if event.buttons() == Qt.LeftButton and self.dragging:
             self.move(event.globalPos() - self.drag_position)
+            self.settings.set_main_window_position(self.x(), self.y())
             event.accept()
             
     def mouseReleaseEvent(self, event: QMouseEvent):
         self.dragging = False
 
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="main.py", description="AeroSys HUD system monitor.")
+    parser.add_argument("--headless", action="store_true", help="run without a GUI, see main.py --headless --help")
+    parser.add_argument("--record", metavar="FILE", help="write every snapshot to a binary log")
+    parser.add_argument("--replay", metavar="FILE", help="show a recorded log instead of live data")
+    parser.add_argument("--speed", default="1", help="replay speed: a factor such as 1 or 10, or max")
+    # Anything else is left for Qt (-style, -platform, ...)
+    args, _ = parser.parse_known_args(argv)
+    if args.speed == "max":
+        args.speed = None
+    else:
+        try:
+            args.speed = float(args.speed)
+        except ValueError:
+            parser.error(f"invalid --speed {args.speed!r}")
+        if args.speed <= 0:
+            parser.error("--speed must be positive")
+    return args
+
 if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
     
     # Set application style
     app.setStyle("Fusion")
     
-    window = AeroSysHUD()
+    window = AeroSysHUD(live=args.replay is None)
     window.show()
+    if args.record:
+        window.start_recording(args.record)
+    if args.replay:
+        try:
+            window.start_replay(args.replay, args.speed)
+        except (OSError, ValueError) as e:
+            print(f"Cannot replay {args.replay}: {e}")
+            sys.exit(2)
     
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,44 @@
+# Performance profiles from most to least expensive; adaptive is stepped
+# down by raising its floor interval before falling back to low_power
+PROFILE_LADDER = ("high_performance", "balanced", "low_power")
+
+def cheaper_mode(mode):
+    """Next cheaper performance profile, or None if `mode` is the cheapest"""
+    if mode == "adaptive":
+        return "low_power"
+    if mode not in PROFILE_LADDER:
+        return "balanced"
+    i = PROFILE_LADDER.index(mode)
+    return PROFILE_LADDER[i + 1] if i + 1 < len(PROFILE_LADDER) else None
+
+class OverheadBudget:
+    """Watches the HUD's own CPU use against a budget.
+
+    `cpu_percent` is a share of one core, as in top. Once the measured
+    usage has stayed above the budget for `hold` seconds the on_exceeded
+    callback is called with it (from the sampler thread); the next
+    decision then waits another `hold` seconds so the cheaper profile
+    gets a chance to take effect.
+    """
+    def __init__(self, cpu_percent=2.0, hold=30):
+        self.cpu_percent = cpu_percent
+        self.hold = hold
+        self.exceeded_since = None
+        self.quiet_until = None
+
+    def observe(self, usage, now):
+        """Feed the latest own CPU percentage, return True when acting on it"""
+        if self.quiet_until is not None and now < self.quiet_until:
+            return False
+        if usage <= self.cpu_percent:
+            self.exceeded_since = None
+            return False
+        if self.exceeded_since is None:
+            self.exceeded_since = now
+        if now - self.exceeded_since < self.hold:
+            return False
+        self.exceeded_since = None
+        self.quiet_until = now + self.hold
+        if hasattr(self, 'on_exceeded'):
+            self.on_exceeded(usage)
+        return True
@@ -0,0 +1,93 @@
+import heapq
+import time
+from collections import namedtuple
+from operator import attrgetter
+
+import psutil
+
+# One row of the process table. cpu is a share of the whole machine (0-100),
+# rss is in bytes and io in bytes/s read + written.
+ProcessInfo = namedtuple("ProcessInfo", ["pid", "name", "cpu", "rss", "io"])
+
+# Top-N rows by CPU, resident memory and disk I/O
+TopProcesses = namedtuple("TopProcesses", ["cpu", "memory", "io"])
+
+# Attributes fetched by the psutil fallback, read together inside oneshot()
+PROCESS_ATTRS = ["pid", "name", "create_time", "cpu_times", "memory_info", "io_counters"]
+
+class ProcessCollector:
+    """Keeps per-process counters between ticks and reports the top N.
+
+    Processes are tracked by (pid, create_time) so a recycled PID starts
+    from scratch instead of inheriting another process' counters. CPU and
+    I/O rates come from the deltas between two ticks; the first tick a
+    process is seen it only contributes its memory.
+
+    With a ProcStats the table is read straight from /proc/<pid>, otherwise
+    through psutil.process_iter() restricted to PROCESS_ATTRS.
+    """
+    def __init__(self, procfs=None, top_n=5):
+        self.procfs = procfs
+        self.top_n = top_n
+        self.cpu_count = psutil.cpu_count() or 1
+        self.tracked = {}  # (pid, create_time) -> (cpu_time, io_bytes)
+        self.last_time = None
+
+    def read_processes(self):
+        """Yield (pid, name, create_time, cpu_seconds, rss_bytes, io_bytes)"""
+        if self.procfs is not None:
+            for pid, name, start, cpu_time, rss in self.procfs.processes():
+                previous = self.tracked.get((pid, start))
+                if previous is not None and previous[0] == cpu_time:
+                    # Not scheduled since the last tick, so no new I/O either
+                    io_bytes = previous[1]
+                else:
+                    io_bytes = self.procfs.process_io(pid)
+                yield pid, name, start, cpu_time, rss, io_bytes
+            return
+        for process in psutil.process_iter(PROCESS_ATTRS, ad_value=None):
+            info = process.info
+            cpu_times = info["cpu_times"]
+            memory = info["memory_info"]
+            io = info["io_counters"]
+            yield (
+                info["pid"], info["name"] or "?", info["create_time"],
+                cpu_times.user + cpu_times.system if cpu_times else None,
+                memory.rss if memory else 0,
+                io.read_bytes + io.write_bytes if io else None,
+            )
+
+    def sample(self):
+        """Walk all processes once and return a TopProcesses"""
+        now = time.monotonic()
+        elapsed = now - self.last_time if self.last_time is not None else 0
+        scale = 100.0 / (elapsed * self.cpu_count) if elapsed > 0 else 0
+
+        tracked = {}
+        rows = []
+        for pid, name, create_time, cpu_time, rss, io_bytes in self.read_processes():
+            key = (pid, create_time)
+            cpu = io_rate = 0.0
+            previous = self.tracked.get(key)
+            if previous is not None and scale:
+                last_cpu, last_io = previous
+                if cpu_time is not None and last_cpu is not None:
+                    cpu = min(100.0, max(0.0, cpu_time - last_cpu) * scale)
+                if io_bytes is not None and last_io is not None:
+                    io_rate = max(0, io_bytes - last_io) / elapsed
+
+            tracked[key] = (cpu_time, io_bytes)
+            rows.append(ProcessInfo(pid, name, cpu, rss, io_rate))
+
+        # Exited processes drop out here
+        self.tracked = tracked
+        self.last_time = now
+        return self.top(rows)
+
+    def top(self, rows):
+        # nlargest keeps an N-sized heap instead of sorting every process
+        return TopProcesses(
+            tuple(heapq.nlargest(self.top_n, rows, key=attrgetter("cpu"))),
+            tuple(heapq.nlargest(self.top_n, rows, key=attrgetter("rss"))),
+            tuple(heapq.nlargest(self.top_n, rows, key=attrgetter("io"))),
+        )
@@ -0,0 +1,203 @@
+import os
+import sys
+
+# /proc/diskstats sectors are always 512 bytes, whatever the device uses
+SECTOR_SIZE = 512
+
+# Units of the per-process counters in /proc/<pid>/stat
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+class ProcFile:
+    """A /proc file kept open and re-read into a reusable bytearray"""
+    def __init__(self, path, size=4096):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY)
+        self.buffer = bytearray(size)
+
+    def read(self):
+        """Re-read the file from offset 0, return the number of valid bytes"""
+        while True:
+            n = os.preadv(self.fd, [self.buffer], 0)
+            if n < len(self.buffer):
+                return n
+            # File outgrew the buffer - grow once and keep the larger size
+            self.buffer = bytearray(len(self.buffer) * 2)
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+class ProcStats:
+    """Linux collector reading CPU, memory, network and disk counters
+    straight from /proc with persistent file handles.
+
+    Only the fields SystemMonitor displays are parsed. Each method re-reads
+    its own file so collectors keep their individual schedules. /proc/stat
+    is required; the other files may be missing (some containers and
+    sandboxes), in which case their methods return None.
+    """
+    def __init__(self, root="/proc"):
+        self.root = root
+        self.stat = ProcFile(os.path.join(root, "stat"), 16384)
+        self.meminfo = self.open_optional(os.path.join(root, "meminfo"))
+        self.net_dev = self.open_optional(os.path.join(root, "net", "dev"))
+        self.diskstats = self.open_optional(os.path.join(root, "diskstats"), 16384)
+        # Scratch buffer for the per-process files, which can't stay open
+        self.process_buffer = bytearray(4096)
+
+    @staticmethod
+    def open_optional(path, size=4096):
+        """ProcFile for `path`, or None if it can't be opened"""
+        try:
+            return ProcFile(path, size)
+        except OSError:
+            return None
+
+    @staticmethod
+    def supported(root="/proc"):
+        return (
+            sys.platform.startswith("linux")
+            and hasattr(os, "preadv")
+            and os.path.exists(os.path.join(root, "stat"))
+        )
+
+    def cpu_times(self):
+        """Per-core (total, busy, user, system, iowait) in clock ticks.
+
+        Same split as SystemMonitor.split_cpu_times(): guest time is already
+        part of user/nice and is not counted twice.
+        """
+        n = self.stat.read()
+        buf = self.stat.buffer
+        cores = []
+        # Skip the aggregate "cpu " line, per-core lines follow as "cpuN"
+        pos = buf.find(b"\ncpu", 0, n)
+        while pos != -1:
+            end = buf.find(b"\n", pos + 1, n)
+            fields = buf[pos + 1:end].split()
+            user, nice, system, idle, iowait, irq, softirq, steal = map(int, fields[1:9])
+            total = user + nice + system + idle + iowait + irq + softirq + steal
+            cores.append((total, total - idle - iowait, user, system, iowait))
+            if buf.startswith(b"cpu", end + 1):
+                pos = end
+            else:
+                break
+        return cores
+
+    def memory_percent(self):
+        """Used memory percentage, computed like psutil.virtual_memory()"""
+        if self.meminfo is None:
+            return None
+        n = self.meminfo.read()
+        buf = self.meminfo.buffer
+        total = self.int_field(buf, n, b"MemTotal:")
+        available = self.int_field(buf, n, b"MemAvailable:")
+        if not total or available is None:
+            return None
+        return (total - available) * 100.0 / total
+
+    @staticmethod
+    def int_field(buf, n, key, unit=b"kB"):
+        start = buf.find(key, 0, n)
+        if start == -1:
+            return None
+        end = buf.find(unit, start + len(key), n)
+        if end == -1:
+            end = n
+        return int(buf[start + len(key):end])
+
+    def network_counters(self):
+        """Per-interface (bytes_recv, bytes_sent) from /proc/net/dev"""
+        if self.net_dev is None:
+            return None
+        n = self.net_dev.read()
+        buf = self.net_dev.buffer
+        counters = {}
+        # First two lines are headers
+        pos = buf.find(b"\n", buf.find(b"\n", 0, n) + 1, n) + 1
+        while 0 < pos < n:
+            end = buf.find(b"\n", pos, n)
+            if end == -1:
+                end = n
+            colon = buf.find(b":", pos, end)
+            if colon != -1:
+                fields = buf[colon + 1:end].split()
+                counters[buf[pos:colon].strip().decode()] = (int(fields[0]), int(fields[8]))
+            pos = end + 1
+        return counters
+
+    def disk_counters(self):
+        """Per-device (reads, read_bytes, writes, write_bytes, busy_ms) from /proc/diskstats"""
+        if self.diskstats is None:
+            return None
+        n = self.diskstats.read()
+        buf = self.diskstats.buffer
+        counters = {}
+        pos = 0
+        while pos < n:
+            end = buf.find(b"\n", pos, n)
+            if end == -1:
+                end = n
+            fields = buf[pos:end].split()
+            if len(fields) >= 13:
+                counters[fields[2].decode()] = (
+                    int(fields[3]), int(fields[5]) * SECTOR_SIZE,
+                    int(fields[7]), int(fields[9]) * SECTOR_SIZE,
+                    int(fields[12]),
+                )
+            pos = end + 1
+        return counters
+
+    def processes(self):
+        """Yield (pid, name, start_ticks, cpu_seconds, rss_bytes) per process.
+
+        Only /proc/<pid>/stat is read, into one shared buffer. Processes that
+        exit mid-walk are skipped.
+        """
+        buf = self.process_buffer
+        for entry in os.listdir(self.root):
+            if not entry.isdigit():
+                continue
+            n = self.read_into(f"{self.root}/{entry}/stat", buf)
+            if not n:
+                continue
+            # comm may contain spaces and parentheses - fields start after the last ')'
+            close = buf.rfind(b")", 0, n)
+            name = buf[buf.find(b"(", 0, close) + 1:close].decode(errors="replace")
+            fields = buf[close + 2:n].split()
+            cpu = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+            yield int(entry), name, int(fields[19]), cpu, int(fields[21]) * PAGE_SIZE
+
+    def process_io(self, pid):
+        """Storage bytes read + written by a process, None if not readable"""
+        buf = self.process_buffer
+        n = self.read_into(f"{self.root}/{pid}/io", buf)
+        if not n:
+            return None
+        read_bytes = self.int_field(buf, n, b"\nread_bytes:", b"\n")
+        write_bytes = self.int_field(buf, n, b"\nwrite_bytes:", b"\n")
+        if read_bytes is None or write_bytes is None:
+            return None
+        return read_bytes + write_bytes
+
+    @staticmethod
+    def read_into(path, buf):
+        """Read a small file into `buf`, return the byte count or 0 on error"""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return 0
+        try:
+            return os.readv(fd, [buf])
+        except OSError:
+            return 0
+        finally:
+            os.close(fd)
+
+    def close(self):
+        for proc_file in (self.stat, self.meminfo, self.net_dev, self.diskstats):
+            if proc_file is not None:
+                proc_file.close()
@@ -0,0 +1,134 @@
+import marshal
+import struct
+import threading
+import time
+
+from processes import ProcessInfo, TopProcesses
+from system_monitor import Snapshot, CollectedAt, DiskRate, InterfaceRate, MountUsage
+
+MAGIC = b"AEROREC\x00"
+VERSION = 1
+# magic, version, length of the field names that follow
+HEADER = struct.Struct("<8sII")
+# seconds since the recording started, payload length
+RECORD = struct.Struct("<dI")
+MARSHAL_VERSION = 4
+
+def plain(value):
+    """Namedtuples and lists as plain tuples, which marshal can encode"""
+    if isinstance(value, (tuple, list)):
+        return tuple(plain(item) for item in value)
+    return value
+
+def top_processes(value):
+    if value is None:
+        return None
+    return TopProcesses(*(tuple(ProcessInfo(*row) for row in rows) for rows in value))
+
+# Snapshot fields holding namedtuples, rebuilt from their plain form
+DECODERS = {
+    "collected_at": lambda value: CollectedAt(*value),
+    "disk_mounts": lambda value: tuple(MountUsage(*row) for row in value),
+    "disk_devices": lambda value: tuple(DiskRate(*row) for row in value),
+    "network_interfaces": lambda value: tuple(InterfaceRate(*row) for row in value),
+    "top_processes": top_processes,
+}
+
+# Values of fields an older recording doesn't have; anything else reads as 0
+MISSING = {
+    "collected_at": None,
+    "cpu_per_core": (),
+    "disk_mounts": (),
+    "disk_devices": (),
+    "network_interfaces": (),
+    "temperature": None,
+    "temperature_packages": (),
+    "temperature_cores": (),
+    "top_processes": None,
+}
+
+class SnapshotRecorder:
+    """Appends every snapshot to a compact binary log.
+
+    After a header listing the snapshot fields, each record is its time
+    offset plus a marshalled tuple of field values in which values that
+    did not change since the previous record are stored as Ellipsis, so
+    slow metrics (mounts, top processes, temperatures) cost almost nothing
+    between refreshes. write() can be used directly as a sampler listener.
+    """
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        names = "\n".join(Snapshot.FIELDS).encode("utf-8")
+        self.file.write(HEADER.pack(MAGIC, VERSION, len(names)) + names)
+        self.started = time.monotonic()
+        self.previous = None
+        self.lock = threading.Lock()
+
+    def write(self, snapshot, seconds=None):
+        """Append a snapshot, stamped `seconds` after the start (default: now)"""
+        if seconds is None:
+            seconds = time.monotonic() - self.started
+        with self.lock:
+            if self.file is None:
+                return
+            previous = self.previous
+            if previous is None:
+                values = tuple(plain(value) for value in snapshot)
+            else:
+                values = tuple(
+                    ... if value is last or value == last else plain(value)
+                    for value, last in zip(snapshot, previous)
+                )
+            self.previous = snapshot
+            payload = marshal.dumps(values, MARSHAL_VERSION)
+            self.file.write(RECORD.pack(seconds, len(payload)) + payload)
+            # One small write per snapshot; keeps the log usable after a crash
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+def read_log(path):
+    """Return [(seconds since start, Snapshot), ...] from a recorded log.
+
+    Fields an older recording lacks get the MISSING defaults; a record
+    cut short by a crash ends the log.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is not a snapshot recording")
+    magic, version, names_length = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a snapshot recording (or from a newer version)")
+    offset = HEADER.size + names_length
+    names = data[HEADER.size:offset].decode("utf-8").split("\n")
+
+    decoders = [DECODERS.get(name) for name in names]
+    values = [None] * len(names)
+    index = {name: i for i, name in enumerate(names)}
+    missing = [(i, MISSING.get(field, 0)) for i, field in enumerate(Snapshot.FIELDS) if field not in index]
+    positions = [index.get(field) for field in Snapshot.FIELDS]
+    fields = [None] * len(positions)
+    records = []
+    while offset + RECORD.size <= len(data):
+        seconds, length = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if offset + length > len(data):
+            break
+        changes = marshal.loads(data[offset:offset + length])
+        offset += length
+        for i, value in enumerate(changes):
+            if value is not ...:
+                decode = decoders[i]
+                values[i] = decode(value) if decode is not None else value
+        for i, position in enumerate(positions):
+            if position is not None:
+                fields[i] = values[position]
+        for i, value in missing:
+            fields[i] = value
+        records.append((seconds, Snapshot(*fields)))
+    return records
@@ -0,0 +1,288 @@
+import math
+import random
+import sys
+import threading
+import time
+
+from diagnostics import TIMING_EVERY
+
+# Wakeups are rounded up to wall-clock boundaries so sampling, the clock and
+# other periodic work fire together: whole seconds when the refresh interval
+# is a whole number of seconds, half or quarter seconds when it is a multiple
+# of those. Other intervals are not aligned, rounding would change them.
+ALIGN_GRANULARITY = 1.0
+SUBSECOND_GRANULARITIES = (0.5, 0.25)
+# After a failed collection cycle the next one waits at least this long
+FAILURE_BACKOFF = 1.0
+# A boundary this close before the target still counts, so a deadline a few
+# milliseconds past a second edge does not slip by a whole second
+ALIGN_SLACK = 0.05
+
+def align_up(wall_time, granularity=ALIGN_GRANULARITY):
+    """Round a time.time() value up to the next multiple of `granularity`"""
+    return math.ceil((wall_time - ALIGN_SLACK) / granularity) * granularity
+
+def alignment_step(interval):
+    """Largest boundary step that divides `interval` evenly, or None"""
+    for step in (ALIGN_GRANULARITY,) + SUBSECOND_GRANULARITIES:
+        multiple = round(interval / step)
+        if multiple >= 1 and abs(interval - multiple * step) < 1e-6:
+            return step
+    return None
+
+if sys.platform == "win32":
+    import ctypes
+
+    class LASTINPUTINFO(ctypes.Structure):
+        _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+
+def user_idle_seconds():
+    """Seconds since the last keyboard/mouse input, or None if unknown"""
+    if sys.platform != "win32":
+        return None
+    info = LASTINPUTINFO()
+    info.cbSize = ctypes.sizeof(info)
+    if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+        return None
+    elapsed_ms = (ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF
+    return elapsed_ms / 1000.0
+
+class AdaptiveRate:
+    """Chooses the refresh interval for the adaptive performance mode.
+
+    Drops straight to the floor interval while CPU or network values move
+    quickly or the pointer is over one of our windows, and backs off
+    exponentially towards the ceiling while values are stable or the
+    session is idle.
+    """
+    CPU_STEP = 5             # percentage points between samples
+    NET_STEP = 64 * 1024     # bytes/s between samples
+    NET_RATIO = 0.5          # ... and at least this relative change
+    IDLE_AFTER = 120         # seconds without user input
+
+    def __init__(self, floor=0.25, ceiling=5.0, backoff=1.5):
+        self.floor = floor
+        self.ceiling = ceiling
+        self.backoff = backoff
+        self.interval = max(floor, min(ceiling, 1.0))
+        self.user_present = False
+        self.last = None
+
+    def set_bounds(self, floor, ceiling):
+        self.floor = floor
+        self.ceiling = max(floor, ceiling)
+        self.interval = max(self.floor, min(self.ceiling, self.interval))
+
+    def observe(self, cpu, net_rate, idle_seconds=None):
+        """Feed the latest sample, return the interval to use next"""
+        volatile = False
+        if self.last is not None:
+            last_cpu, last_net = self.last
+            net_delta = abs(net_rate - last_net)
+            volatile = (
+                abs(cpu - last_cpu) >= self.CPU_STEP
+                or (net_delta >= self.NET_STEP and net_delta >= self.NET_RATIO * max(net_rate, last_net))
+            )
+        self.last = (cpu, net_rate)
+        idle = idle_seconds is not None and idle_seconds >= self.IDLE_AFTER
+
+        if self.user_present or (volatile and not idle):
+            self.interval = self.floor
+        else:
+            self.interval = min(self.ceiling, self.interval * self.backoff)
+        self.interval = round(self.interval, 2)
+        return self.interval
+
+class DemandTracker:
+    """Tracks which metrics the currently active consumers need.
+
+    Each consumer (main window, floating widget, exporter, ...) registers the
+    metrics it displays and flips itself active/inactive as it is shown or
+    hidden. The sampler only collects the union of what active consumers need.
+    """
+    def __init__(self):
+        self.consumers = {}
+        self.listeners = []
+        self._lock = threading.Lock()
+        self._demanded = frozenset()
+
+    def register(self, consumer, metrics, active=False):
+        with self._lock:
+            self.consumers[consumer] = [frozenset(metrics), active]
+        self._changed()
+
+    def unregister(self, consumer):
+        with self._lock:
+            self.consumers.pop(consumer, None)
+        self._changed()
+
+    def set_active(self, consumer, active):
+        with self._lock:
+            entry = self.consumers.get(consumer)
+            if entry is None or entry[1] == active:
+                return
+            entry[1] = active
+        self._changed()
+
+    def demanded(self):
+        """Metrics needed by at least one active consumer"""
+        return self._demanded
+
+    def others_active(self, consumer):
+        """True if any consumer besides `consumer` is active"""
+        with self._lock:
+            return any(active for name, (_, active) in self.consumers.items() if name != consumer)
+
+    def add_listener(self, callback):
+        """Register a callable invoked whenever the demanded set changes"""
+        self.listeners.append(callback)
+
+    def _changed(self):
+        with self._lock:
+            demanded = frozenset().union(
+                *(metrics for metrics, active in self.consumers.values() if active)
+            )
+            if demanded == self._demanded:
+                return
+            self._demanded = demanded
+        for callback in self.listeners:
+            callback()
+
+class Sampler(threading.Thread):
+    """Runs SystemMonitor collection on a worker thread.
+
+    Collection follows the monitor's per-metric schedule, limited to the
+    metrics some active consumer demands: the worker sleeps until the earliest
+    staleness deadline, runs every collector that is due and freezes the
+    result into an immutable snapshot for the listeners. With nothing
+    demanded it sleeps until demand changes. Listeners are called from the
+    worker thread, so GUI code should forward them through a queued Qt signal.
+
+    Wakeups are aligned to wall-clock boundaries. With self_timed=False the
+    worker never sleeps on its own deadline; instead every cycle reports the
+    next aligned wakeup to the cycle listeners and an external scheduler
+    calls wake() at that time, so all periodic work shares one timer.
+    """
+    def __init__(self, system_monitor, demand=None, self_timed=True):
+        super().__init__(name="AeroSysSampler", daemon=True)
+        self.system_monitor = system_monitor
+        self.demand = demand if demand is not None else DemandTracker()
+        self.demand.add_listener(self.wake)
+        self.adaptive = AdaptiveRate()
+        self.self_timed = self_timed
+        self.listeners = []
+        self.cycle_listeners = []
+        self._latest = system_monitor.snapshot()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._running = True
+
+    def add_listener(self, callback):
+        """Register a callable that receives every new snapshot"""
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        # Rebind instead of mutating - the worker may be iterating the list
+        self.listeners = [listener for listener in self.listeners if listener != callback]
+
+    def add_cycle_listener(self, callback):
+        """Register a callable receiving the next aligned wakeup (time.time()
+        based, None when nothing is demanded) after every collection cycle"""
+        self.cycle_listeners.append(callback)
+
+    def next_wakeup(self, metrics):
+        """Wall-clock time of the next aligned collection, or None"""
+        deadline = self.system_monitor.next_deadline(metrics)
+        if deadline is None:
+            return None
+        wakeup = time.time() + deadline - time.monotonic()
+        step = alignment_step(self.system_monitor.update_interval)
+        return wakeup if step is None else align_up(wakeup, step)
+
+    def latest(self):
+        """Return the most recent snapshot"""
+        with self._lock:
+            return self._latest
+
+    def set_mode(self, performance_mode):
+        """Switch the collection schedule and wake the worker"""
+        self.system_monitor.set_schedule(performance_mode)
+        self.wake()
+
+    def set_user_present(self, present):
+        """Pointer entered/left one of our windows (adaptive mode boost)"""
+        self.adaptive.user_present = present
+        if present and self.system_monitor.performance_mode == "adaptive":
+            self.adaptive.interval = self.adaptive.floor
+            self.system_monitor.set_adaptive_interval(self.adaptive.floor)
+            self.wake()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+
+    def adapt(self):
+        monitor = self.system_monitor
+        if monitor.cpu_usage is None:
+            return
+        interval = self.adaptive.observe(
+            monitor.cpu_usage,
+            monitor.network_upload + monitor.network_download,
+            user_idle_seconds(),
+        )
+        monitor.set_adaptive_interval(interval)
+
+    def run(self):
+        tick_timing = self.system_monitor.tick_timing
+        countdown = 1
+        while self._running:
+            self._wake.clear()
+            metrics = self.demand.demanded()
+            # Fast ticks are timed one in TIMING_EVERY on average, at random
+            # gaps of 1 to 2*TIMING_EVERY-1 ticks; kept local since this runs
+            # every tick
+            timed = False
+            if tick_timing is not None:
+                if not tick_timing.sampled:
+                    timed = True
+                else:
+                    countdown -= 1
+                    if not countdown:
+                        countdown = random.randint(1, 2 * TIMING_EVERY - 1)
+                        timed = True
+            started = time.perf_counter_ns() if timed else 0
+            failed = False
+            try:
+                updated = self.system_monitor.update_due(metrics=metrics, timed=timed)
+                if "cpu" in updated and self.system_monitor.performance_mode == "adaptive":
+                    self.adapt()
+                snapshot = self.system_monitor.snapshot() if updated else None
+            except Exception as e:
+                print(f"Sampling failed: {e}")
+                snapshot = None
+                failed = True
+            if snapshot is not None and tick_timing is not None:
+                tick_timing.calls += 1
+                if timed:
+                    tick_timing.record(started, time.perf_counter_ns())
+            if snapshot is not None:
+                with self._lock:
+                    self._latest = snapshot
+                for callback in self.listeners:
+                    callback(snapshot)
+
+            # Sleep until the next demanded metric runs out of staleness
+            # budget, but wake early on schedule/demand changes or shutdown
+            wakeup = self.next_wakeup(metrics)
+            if failed and wakeup is not None:
+                # Don't retry a broken cycle in a tight loop
+                wakeup = max(wakeup, time.time() + FAILURE_BACKOFF)
+            for callback in self.cycle_listeners:
+                callback(wakeup)
+            timeout = None
+            if self.self_timed and wakeup is not None:
+                timeout = max(0.0, wakeup - time.time())
+            self._wake.wait(timeout)
@@ -0,0 +1,61 @@
+import time
+from PyQt5.QtCore import QObject, QTimer, Qt
+from sampler import align_up, ALIGN_SLACK
+
+class AlignedScheduler(QObject):
+    """One timer for all periodic and one-shot work on the GUI thread.
+
+    Jobs are due at wall-clock times aligned to second boundaries. The timer
+    is armed for the earliest due job only, and when it fires every job that
+    is due by then runs in the same wakeup.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.jobs = {}  # name -> [due, period or None, callback]
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.run_due)
+        self.wakeups = 0
+
+    def every(self, name, period, callback):
+        """Run callback on every `period`-second boundary"""
+        if name in self.jobs and self.jobs[name][1] == period:
+            return
+        self.jobs[name] = [align_up(time.time(), period), period, callback]
+        self.arm()
+
+    def at(self, name, when, callback):
+        """Run callback once at wall-clock time `when`, replacing any earlier request"""
+        self.jobs[name] = [when, None, callback]
+        self.arm()
+
+    def after(self, name, delay, callback):
+        """Run callback once, `delay` seconds from now rounded up to a boundary"""
+        self.at(name, align_up(time.time() + delay), callback)
+
+    def cancel(self, name):
+        if self.jobs.pop(name, None) is not None:
+            self.arm()
+
+    def arm(self):
+        if not self.jobs:
+            self.timer.stop()
+            return
+        due = min(job[0] for job in self.jobs.values())
+        self.timer.start(max(0, int(round((due - time.time()) * 1000))))
+
+    def run_due(self):
+        self.wakeups += 1
+        now = time.time()
+        for name, job in list(self.jobs.items()):
+            due, period, callback = job
+            if due > now + 0.005:
+                continue
+            if period is None:
+                del self.jobs[name]
+            else:
+                # Next boundary strictly after this wakeup, skipping any missed ones
+                job[0] = align_up(now + 2 * ALIGN_SLACK, period)
+            callback()
+        self.arm()
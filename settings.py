@@ -1,11 +1,48 @@
 import json
 import os
 import sys
-import winreg as reg
+import tempfile
+import threading
+import time
+from copy import deepcopy
+from alerts import DEFAULT_RULES
+try:
+    import winreg as reg
+except ImportError:  # Not on Windows - startup registration is unavailable
+    reg = None
+
+CONFIG_NAME = "aerohud_config.json"
+
+# Changes are written this long after the last one, so drags and bursts
+# of toggles cost a single write
+SAVE_DELAY = 0.5
+
+def config_dir():
+    """Per-user configuration directory for AeroSys HUD"""
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "AeroSysHUD")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Application Support/AeroSysHUD")
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(base, "aerosyshud")
 
 class Settings:
-    def __init__(self):
-        self.config_file = "aerohud_config.json"
+    """User settings, persisted as JSON in the per-user config directory.
+
+    Setters only mark the settings dirty. A background thread writes them
+    SAVE_DELAY seconds after the last change, atomically through a temp
+    file and rename; flush() writes pending changes immediately. Writes
+    are serialized, each taking its copy of the settings after the
+    previous one finished, so an older copy never lands last.
+    """
+    def __init__(self, directory=None):
+        self.config_dir = directory or config_dir()
+        self.config_file = os.path.join(self.config_dir, CONFIG_NAME)
+        self._save_condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._dirty_since = None
+        self._writer = None
         self.theme = "dark"
         self.widget_visible = False
         self.startup_enabled = False
@@ -14,18 +51,31 @@ class Settings:
         
         # New settings
         self.overlay_mode = "desktop_only"  # or "all_screens"
-        self.performance_mode = "balanced"  # balanced, low_power, high_performance
+        self.performance_mode = "balanced"  # balanced, low_power, high_performance, adaptive
+        self.adaptive_min_interval = 0.25  # seconds, adaptive mode floor
+        self.adaptive_max_interval = 5.0   # seconds, adaptive mode ceiling
         self.widget_auto_hide = False
         self.widget_click_through = False
         self.widget_opacity = 0.9
+        self.metrics_endpoint = False  # OpenMetrics exporter on localhost
+        self.metrics_port = 9717
+        self.alerts_enabled = False
+        self.alert_rules = deepcopy(DEFAULT_RULES)
+        self.alert_log = False  # append alerts to alerts.log in the config directory
+        self.overhead_budget_enabled = True  # step down the profile when we use too much CPU
+        self.overhead_cpu_budget = 2.0  # percent of one core
         
         self.load_settings()
         self.check_startup()
         
     def load_settings(self):
-        if os.path.exists(self.config_file):
+        path = self.config_file
+        if not os.path.exists(path) and os.path.exists(CONFIG_NAME):
+            # Older versions kept the file in the working directory
+            path = CONFIG_NAME
+        if os.path.exists(path):
             try:
-                with open(self.config_file, 'r') as f:
+                with open(path, 'r') as f:
                     data = json.load(f)
                     self.theme = data.get('theme', 'dark')
                     self.widget_visible = data.get('widget_visible', False)
@@ -36,16 +86,80 @@ class Settings:
                     # New settings
                     self.overlay_mode = data.get('overlay_mode', 'desktop_only')
                     self.performance_mode = data.get('performance_mode', 'balanced')
+                    self.adaptive_min_interval = data.get('adaptive_min_interval', 0.25)
+                    self.adaptive_max_interval = data.get('adaptive_max_interval', 5.0)
                     self.widget_auto_hide = data.get('widget_auto_hide', False)
                     self.widget_click_through = data.get('widget_click_through', False)
                     self.widget_opacity = data.get('widget_opacity', 0.9)
-            except:
+                    self.metrics_endpoint = data.get('metrics_endpoint', False)
+                    self.metrics_port = data.get('metrics_port', 9717)
+                    self.alerts_enabled = data.get('alerts_enabled', False)
+                    self.alert_rules = data.get('alert_rules', deepcopy(DEFAULT_RULES))
+                    self.alert_log = data.get('alert_log', False)
+                    self.overhead_budget_enabled = data.get('overhead_budget_enabled', True)
+                    self.overhead_cpu_budget = data.get('overhead_cpu_budget', 2.0)
+            except (OSError, ValueError, AttributeError):
+                # Keep the unreadable file for inspection instead of overwriting it
+                try:
+                    os.replace(path, path + ".bad")
+                except OSError:
+                    pass
                 self.create_default_settings()
+            if path != self.config_file:
+                self.save_settings()
         else:
             self.create_default_settings()
             
     def save_settings(self):
-        data = {
+        """Schedule a write SAVE_DELAY seconds after the last change"""
+        with self._save_condition:
+            self._dirty_since = time.monotonic()
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="AeroSysSettings", daemon=True)
+                self._writer.start()
+            self._save_condition.notify()
+            
+    def _write_loop(self):
+        while True:
+            with self._save_condition:
+                while self._dirty_since is None:
+                    self._save_condition.wait()
+                delay = self._dirty_since + SAVE_DELAY - time.monotonic()
+                if delay > 0:
+                    # More changes may arrive; the deadline moves with them
+                    self._save_condition.wait(delay)
+                    continue
+            self.flush()
+            
+    def flush(self):
+        """Write pending changes now (e.g. on quit), after any write in progress"""
+        with self._write_lock:
+            with self._save_condition:
+                if self._dirty_since is None:
+                    return
+                self._dirty_since = None
+                data = self.to_dict()
+            self.write_settings(data)
+        
+    def write_settings(self, data):
+        """Atomically replace the settings file with `data`"""
+        try:
+            os.makedirs(self.config_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=".aerohud_", suffix=".tmp", dir=self.config_dir)
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(data, f, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.config_file)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            print(f"Failed to save settings: {e}")
+            
+    def to_dict(self):
+        return {
             'theme': self.theme,
             'widget_visible': self.widget_visible,
             'startup_enabled': self.startup_enabled,
@@ -55,13 +169,19 @@ class Settings:
             # New settings
             'overlay_mode': self.overlay_mode,
             'performance_mode': self.performance_mode,
+            'adaptive_min_interval': self.adaptive_min_interval,
+            'adaptive_max_interval': self.adaptive_max_interval,
             'widget_auto_hide': self.widget_auto_hide,
             'widget_click_through': self.widget_click_through,
-            'widget_opacity': self.widget_opacity
+            'widget_opacity': self.widget_opacity,
+            'metrics_endpoint': self.metrics_endpoint,
+            'metrics_port': self.metrics_port,
+            'alerts_enabled': self.alerts_enabled,
+            'alert_rules': self.alert_rules,
+            'alert_log': self.alert_log,
+            'overhead_budget_enabled': self.overhead_budget_enabled,
+            'overhead_cpu_budget': self.overhead_cpu_budget
         }
-        
-        with open(self.config_file, 'w') as f:
-            json.dump(data, f, indent=4)
             
     def create_default_settings(self):
         self.theme = "dark"
@@ -71,9 +191,18 @@ class Settings:
         self.widget_position = [1200, 100]
         self.overlay_mode = "desktop_only"
         self.performance_mode = "balanced"
+        self.adaptive_min_interval = 0.25
+        self.adaptive_max_interval = 5.0
         self.widget_auto_hide = False
         self.widget_click_through = False
         self.widget_opacity = 0.9
+        self.metrics_endpoint = False
+        self.metrics_port = 9717
+        self.alerts_enabled = False
+        self.alert_rules = deepcopy(DEFAULT_RULES)
+        self.alert_log = False
+        self.overhead_budget_enabled = True
+        self.overhead_cpu_budget = 2.0
         self.save_settings()
         
     def toggle_theme(self):
@@ -90,6 +219,8 @@ class Settings:
         
     def enable_startup(self):
         """Add application to Windows startup"""
+        if reg is None:
+            return False
         try:
             key = reg.HKEY_CURRENT_USER
             subkey = r"Software\Microsoft\Windows\CurrentVersion\Run"
@@ -110,6 +241,8 @@ class Settings:
             
     def disable_startup(self):
         """Remove application from Windows startup"""
+        if reg is None:
+            return False
         try:
             key = reg.HKEY_CURRENT_USER
             subkey = r"Software\Microsoft\Windows\CurrentVersion\Run"
@@ -124,6 +257,9 @@ class Settings:
             
     def check_startup(self):
         """Check if application is in Windows startup"""
+        if reg is None:
+            self.startup_enabled = False
+            return
         try:
             key = reg.HKEY_CURRENT_USER
             subkey = r"Software\Microsoft\Windows\CurrentVersion\Run"
@@ -148,6 +284,11 @@ class Settings:
     def set_performance_mode(self, mode):
         self.performance_mode = mode
         self.save_settings()
+        
+    def set_adaptive_bounds(self, min_interval, max_interval):
+        self.adaptive_min_interval = max(0.1, min_interval)
+        self.adaptive_max_interval = max(self.adaptive_min_interval, max_interval)
+        self.save_settings()
 
     # New methods for widget auto-hide
     def toggle_auto_hide(self):
@@ -161,6 +302,30 @@ class Settings:
         self.save_settings()
         return self.widget_click_through
 
+    def toggle_metrics_endpoint(self):
+        self.metrics_endpoint = not self.metrics_endpoint
+        self.save_settings()
+        return self.metrics_endpoint
+
+    def toggle_alerts(self):
+        self.alerts_enabled = not self.alerts_enabled
+        self.save_settings()
+        return self.alerts_enabled
+        
+    def toggle_overhead_budget(self):
+        self.overhead_budget_enabled = not self.overhead_budget_enabled
+        self.save_settings()
+        return self.overhead_budget_enabled
+
+    # Window positions - called continuously while dragging
+    def set_main_window_position(self, x, y):
+        self.main_window_position = [x, y]
+        self.save_settings()
+        
+    def set_widget_position(self, x, y):
+        self.widget_position = [x, y]
+        self.save_settings()
+
     # New methods for widget opacity
     def set_widget_opacity(self, opacity):
         self.widget_opacity = max(0.1, min(1.0, opacity))
@@ -1,42 +1,518 @@
 import psutil
-import datetime
+import math
+import os
 import time
+from collections import namedtuple
+from diagnostics import Timings
+from processes import ProcessCollector
+from procfs import ProcStats
+from temperature import SysfsTemperatureCollector, TemperatureReading, CPU_HWMON_DRIVERS
+
+class Snapshot:
+    """Immutable copy of the monitor state, produced once per tick.
+
+    Built on the sampler thread and handed as is to the UI, exporter and
+    recorder, so no consumer ever sees a half-updated monitor. Fields are
+    numbers or tuples of namedtuples - nothing is pre-formatted, each
+    consumer formats only what it shows. `sampled_at` is the
+    time.monotonic() at which the snapshot was taken, `collected_at` the
+    CollectedAt stamps telling which values were refreshed since.
+    """
+    FIELDS = (
+        "sampled_at", "collected_at",
+        "cpu_usage", "cpu_per_core", "cpu_user", "cpu_system", "cpu_iowait",
+        "ram_usage", "gpu_usage", "disk_usage", "disk_mounts",
+        "disk_read", "disk_write", "disk_read_iops", "disk_write_iops", "disk_busy", "disk_devices",
+        "network_upload", "network_download",
+        "network_upload_smoothed", "network_download_smoothed", "network_interfaces",
+        "temperature",
+        "temperature_packages", "temperature_cores", "top_processes",
+        "battery_level", "hud_cpu", "hud_rss", "update_interval",
+    )
+    __slots__ = FIELDS
+    
+    def __init__(self, *values):
+        if len(values) != len(self.FIELDS):
+            raise TypeError(f"Snapshot takes {len(self.FIELDS)} values, got {len(values)}")
+        for setter, value in zip(_SNAPSHOT_SETTERS, values):
+            setter(self, value)
+            
+    def __setattr__(self, name, value):
+        raise AttributeError("Snapshot is immutable")
+        
+    def __delattr__(self, name):
+        raise AttributeError("Snapshot is immutable")
+        
+    def __iter__(self):
+        """Values in FIELDS order"""
+        return (getattr(self, name) for name in self.FIELDS)
+        
+    def __reduce__(self):
+        return Snapshot, tuple(self)
+        
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"Snapshot({values})"
+        
+    def replace(self, **changes):
+        """Copy with some fields changed"""
+        values = [changes.pop(name, getattr(self, name)) for name in self.FIELDS]
+        if changes:
+            raise TypeError(f"unknown Snapshot fields: {', '.join(changes)}")
+        return Snapshot(*values)
+        
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+# The slots' own setters - they bypass the __setattr__ guard
+_SNAPSHOT_SETTERS = tuple(getattr(Snapshot, name).__set__ for name in Snapshot.FIELDS)
+
+# Per-interface network throughput in bytes/s, raw and EWMA-smoothed
+InterfaceRate = namedtuple("InterfaceRate", [
+    "name", "download", "upload", "download_smoothed", "upload_smoothed",
+])
+
+# Per-device disk throughput: bytes/s, operations/s and busy percentage
+DiskRate = namedtuple("DiskRate", [
+    "name", "read", "write", "read_iops", "write_iops", "busy",
+])
+
+# Capacity of one mounted filesystem
+MountUsage = namedtuple("MountUsage", ["mountpoint", "fstype", "total", "used", "percent"])
+
+# time.monotonic() at which each collector last ran, None before its first
+# run. A value whose stamp didn't move is the same reading as last tick.
+CollectedAt = namedtuple("CollectedAt", [
+    "cpu", "ram", "gpu", "disk", "disk_io", "network", "temperature", "battery", "processes", "overhead",
+])
+
+# Block devices that never hold user filesystems
+VIRTUAL_DISK_PREFIXES = ("loop", "ram", "zram")
+
+# Largest delta accepted from a wrapped 32-bit counter. A counter that goes
+# backwards by more was reset (interface re-created), not wrapped - /proc
+# counters are 64-bit, so a real wrap needs the old value close to 2**32.
+MAX_WRAP_DELTA = 1 << 30
+
+# Time constant of the network throughput EWMA, in seconds
+NETWORK_SMOOTHING = 3.0
+
+# Per-metric collection schedule for each performance profile.
+# metric -> (period, staleness budget) in seconds. A metric becomes due once
+# its period has elapsed and must be refreshed before the budget runs out;
+# the sampler wakes at the earliest budget deadline and collects everything
+# that is due at that point, so slow metrics piggyback on fast wakeups.
+COLLECTION_SCHEDULES = {
+    "low_power": {
+        "cpu": (3, 3),
+        "gpu": (3, 3),
+        "network": (3, 3),
+        "disk_io": (3, 3),
+        "ram": (10, 15),
+        "temperature": (30, 60),
+        "battery": (120, 300),
+        "disk": (600, 900),
+        "processes": (10, 15),
+        "overhead": (10, 15),
+    },
+    "balanced": {
+        "cpu": (1, 1),
+        "gpu": (1, 1),
+        "network": (1, 1),
+        "disk_io": (1, 1),
+        "ram": (2, 3),
+        "temperature": (5, 10),
+        "battery": (30, 60),
+        "disk": (120, 300),
+        "processes": (3, 5),
+        "overhead": (5, 10),
+    },
+    "high_performance": {
+        "cpu": (0.5, 0.5),
+        "gpu": (0.5, 0.5),
+        "network": (0.5, 0.5),
+        "disk_io": (0.5, 0.5),
+        "ram": (1, 1),
+        "temperature": (2, 3),
+        "battery": (10, 30),
+        "disk": (60, 120),
+        "processes": (2, 3),
+        "overhead": (5, 10),
+    },
+}
+
+# Metrics that follow the adaptive refresh interval; everything else keeps
+# its balanced-profile period
+ADAPTIVE_METRICS = ("cpu", "gpu", "network", "disk_io")
+
+def adaptive_schedule(interval):
+    """Balanced schedule with the fast metrics running every `interval` seconds"""
+    schedule = dict(COLLECTION_SCHEDULES["balanced"])
+    for name in ADAPTIVE_METRICS:
+        schedule[name] = (interval, interval)
+    return schedule
+
+# Numeric values kept in the ring-buffer history: collector -> attributes
+HISTORY_FIELDS = {
+    "cpu": ("cpu_usage", "cpu_user", "cpu_system", "cpu_iowait"),
+    "ram": ("ram_usage",),
+    "gpu": ("gpu_usage",),
+    "disk": ("disk_usage",),
+    "disk_io": ("disk_read", "disk_write", "disk_busy"),
+    "network": ("network_download", "network_upload"),
+    "temperature": ("temperature",),
+    "battery": ("battery_level",),
+}
+HISTORY_FIELD_NAMES = tuple(field for fields in HISTORY_FIELDS.values() for field in fields)
+
+# Every numeric Snapshot field, by the collector that updates it; alert rules
+# can watch any of these
+NUMERIC_FIELDS = {
+    "cpu": ("cpu_usage", "cpu_user", "cpu_system", "cpu_iowait"),
+    "ram": ("ram_usage",),
+    "gpu": ("gpu_usage",),
+    "disk": ("disk_usage",),
+    "disk_io": ("disk_read", "disk_write", "disk_read_iops", "disk_write_iops", "disk_busy"),
+    "network": ("network_download", "network_upload", "network_download_smoothed", "network_upload_smoothed"),
+    "temperature": ("temperature",),
+    "battery": ("battery_level",),
+    "overhead": ("hud_cpu", "hud_rss"),
+}
+NUMERIC_FIELD_NAMES = tuple(field for fields in NUMERIC_FIELDS.values() for field in fields)
+
+# Wakeups may land slightly early; treat anything this close as due
+DUE_TOLERANCE = 0.05
+
+# Walking a large process table is the most expensive collection (about
+# 28 ms for 2000 processes), so the processes period is stretched to keep
+# it under this share of one core - a quarter of the default overhead budget
+PROCESS_CPU_PERCENT = 0.5
+
+def process_period(cost):
+    """Shortest processes period, in seconds, for a walk taking `cost` seconds"""
+    return cost * 100 / PROCESS_CPU_PERCENT
+
 
 class SystemMonitor:
-    def __init__(self):
-        self.cpu_usage = 0
+    def __init__(self, performance_mode="balanced", history_store=None, instrument=True):
+        # CPU shares are None until two readings of the counters exist
+        self.cpu_usage = None
+        self.cpu_per_core = ()
+        self.cpu_user = None
+        self.cpu_system = None
+        self.cpu_iowait = None
         self.ram_usage = 0
-        self.gpu_usage = 0
+        self.gpu_usage = None  # derived from cpu_usage
         self.disk_usage = 0
-        self.network_upload = "0 KB/s"
-        self.network_download = "0 KB/s"
-        self.temperature = 0
+        self.disk_mounts = ()
+        # Disk throughput over whole physical disks
+        self.disk_read = 0.0
+        self.disk_write = 0.0
+        self.disk_read_iops = 0.0
+        self.disk_write_iops = 0.0
+        self.disk_busy = 0.0
+        self.disk_devices = ()
+        # Network throughput in bytes/s, totals exclude loopback
+        self.network_upload = 0.0
+        self.network_download = 0.0
+        self.network_upload_smoothed = 0.0
+        self.network_download_smoothed = 0.0
+        self.network_interfaces = ()
+        self.temperature = None  # None while no sensor is readable
+        self.temperature_packages = ()
+        self.temperature_cores = ()
+        self.top_processes = None  # TopProcesses once the process table was sampled
         self.battery_level = 0
-        self.current_time = "00:00:00"
-        self.current_date = "January 1, 2024"
+        # Our own footprint: CPU as a share of one core (None until a second
+        # overhead sample), resident memory in bytes
+        self.hud_cpu = None
+        self.hud_rss = 0
+        self.update_interval = 1.0
+        
+        # CPU times from the previous tick - percentages are computed from
+        # the delta so each reading covers the whole tick window
+        self.procfs = None
+        if ProcStats.supported():
+            try:
+                self.procfs = ProcStats()
+            except OSError as e:
+                print(f"Reading /proc failed, using psutil: {e}")
+        # Taken on the first CPU collection, so the first value covers a full period
+        self.last_cpu_times = None
+        
+        # Sensors are located once; falls back to psutil only where there is no sysfs
+        self.temperature_collector = SysfsTemperatureCollector()
+        
+        # Per-process counters are kept between ticks by the collector
+        self.process_collector = ProcessCollector(self.procfs)
         
         # Network stats
-        self.last_net_io = psutil.net_io_counters()
-        self.last_net_time = time.time()
-        
-    def update_all(self):
-        self.update_cpu()
-        self.update_ram()
-        self.update_gpu()
-        self.update_disk()
-        self.update_network()
-        self.update_temperature()
-        self.update_battery()
-        self.update_time()
+        self.last_net_io = self.read_network_counters()
+        self.last_net_time = time.monotonic()
+        self.net_smoothed = {}
+        
+        # Disk I/O stats
+        self.whole_disks = self.find_whole_disks()
+        self.last_disk_io = self.read_disk_counters()
+        self.last_disk_time = time.monotonic()
+        
+        # Own CPU time, for the overhead collector; taken on its first run
+        # so start-up work doesn't count
+        self.own_process = psutil.Process()
+        self.last_own_cpu = None
+        
+        # Collectors in dependency order (gpu reads cpu_usage)
+        self.collectors = {
+            "cpu": self.update_cpu,
+            "ram": self.update_ram,
+            "gpu": self.update_gpu,
+            "disk": self.update_disk,
+            "disk_io": self.update_disk_io,
+            "network": self.update_network,
+            "temperature": self.update_temperature,
+            "battery": self.update_battery,
+            "processes": self.update_processes,
+            "overhead": self.update_overhead,
+        }
+        self.last_collected = dict.fromkeys(self.collectors, None)
+        # Optional PersistentHistory fed with the collected values, wall-clock stamped
+        self.history_store = history_store
+        # Optional AlertEngine evaluated on every collected value
+        self.alert_engine = None
+        # Optional OverheadBudget checked on every overhead sample
+        self.overhead_budget = None
+        # Latency histograms, looked up once rather than per call
+        self.timings = Timings() if instrument else None
+        self.collector_timings = {}
+        self.tick_timing = None
+        if self.timings is not None:
+            self.collector_timings = {name: self.timings.histogram(name) for name in self.collectors}
+            self.tick_timing = self.timings.histogram("tick")
+        # Duration of the last process walk, see PROCESS_CPU_PERCENT
+        self.process_cost = 0.0
+        self.set_schedule(performance_mode)
+        
+    def set_schedule(self, performance_mode):
+        """Switch to the per-metric schedule of a performance profile"""
+        self.performance_mode = performance_mode
+        if performance_mode == "adaptive":
+            self.schedule = adaptive_schedule(self.update_interval)
+        else:
+            self.schedule = COLLECTION_SCHEDULES.get(performance_mode, COLLECTION_SCHEDULES["balanced"])
+        self.update_interval = self.schedule["cpu"][0]
+        self.process_schedule = self.schedule["processes"]
+        self.fit_process_period()
+        self.mark_sampled()
+        
+    def set_adaptive_interval(self, interval):
+        """Retune the fast metrics while in adaptive mode"""
+        if self.performance_mode == "adaptive" and interval != self.update_interval:
+            self.schedule = adaptive_schedule(interval)
+            self.update_interval = interval
+            self.process_schedule = self.schedule["processes"]
+            self.fit_process_period()
+            self.mark_sampled()
+            
+    def set_fast_interval(self, interval):
+        """Run the fast metrics every `interval` seconds, keeping the profile's other periods"""
+        schedule = dict(self.schedule)
+        for name in ADAPTIVE_METRICS:
+            schedule[name] = (interval, interval)
+        self.schedule = schedule
+        self.update_interval = interval
+        self.mark_sampled()
+        
+    def fit_process_period(self):
+        """Stretch the profile's processes period to what the last walk cost"""
+        period, staleness = self.process_schedule
+        needed = process_period(self.process_cost)
+        if needed > period:
+            period, staleness = needed, staleness + needed - period
+        schedule = self.schedule
+        if schedule["processes"] != (period, staleness):
+            self.schedule = dict(schedule, processes=(period, staleness))
+            
+    def mark_sampled(self):
+        """Flag the histograms that are only timed on sampled ticks.
+        
+        Collectors that run on more than every other tick are timed on the
+        sampled ticks only; slower ones skip enough ticks that timing every
+        call stays cheap, so they always are.
+        """
+        fastest = min(period for period, _ in self.schedule.values())
+        for name, histogram in self.collector_timings.items():
+            histogram.sampled = self.schedule[name][0] < 2 * fastest
+        if self.tick_timing is not None:
+            self.tick_timing.sampled = any(histogram.sampled for histogram in self.collector_timings.values())
+        
+    def update_all(self, timed=False):
+        now = time.monotonic()
+        for name, collector in self.collectors.items():
+            self.collect(name, collector, now, timed)
+            
+    def update_due(self, now=None, metrics=None, timed=False):
+        """Run every collector whose period has elapsed, return their names.
+        
+        If `metrics` is given, collectors outside that set are left alone.
+        `timed` marks a sampled tick, see mark_sampled().
+        """
+        if now is None:
+            now = time.monotonic()
+        updated = []
+        for name, collector in self.collectors.items():
+            if metrics is not None and name not in metrics:
+                continue
+            last = self.last_collected[name]
+            if last is None or now - last >= self.schedule[name][0] - DUE_TOLERANCE:
+                if self.collect(name, collector, now, timed):
+                    updated.append(name)
+        return updated
+        
+    def collect(self, name, collector, now, timed=False):
+        """Run one collector, return False if it failed.
+        
+        A failing collector is still stamped as collected, so it is retried
+        on its own schedule instead of stalling every other metric.
+        """
+        self.last_collected[name] = now
+        if not self.run_collector(name, collector, timed):
+            return False
+        self.record_history(name, now)
+        return True
+        
+    def run_collector(self, name, collector, timed=False):
+        """Call a collector, counting and timing it into its histogram; False if it raised"""
+        histogram = self.collector_timings.get(name)
+        try:
+            if histogram is None:
+                collector()
+            else:
+                histogram.calls += 1
+                if timed or not histogram.sampled:
+                    started = time.perf_counter_ns()
+                    collector()
+                    histogram.record(started, time.perf_counter_ns())
+                else:
+                    collector()
+        except Exception as e:
+            if histogram is not None:
+                histogram.errors += 1
+            print(f"Collecting {name} failed: {e}")
+            return False
+        return True
+        
+    def record_history(self, collector, now):
+        alert_engine = self.alert_engine
+        if alert_engine is not None:
+            for field in NUMERIC_FIELDS.get(collector, ()):
+                value = getattr(self, field)
+                if value is not None:
+                    alert_engine.observe(field, value, now)
+        history_store = self.history_store
+        if history_store is None:
+            return
+        wall_time = time.time()
+        for field in HISTORY_FIELDS.get(collector, ()):
+            value = getattr(self, field)
+            if value is not None:
+                history_store.add(field, value, wall_time)
+        
+    def next_deadline(self, metrics=None):
+        """Monotonic time by which some metric exceeds its staleness budget.
+        
+        Returns None when no metric (of `metrics`, if given) needs collecting.
+        """
+        deadlines = [
+            (last if last is not None else 0.0) + self.schedule[name][1]
+            for name, last in self.last_collected.items()
+            if metrics is None or name in metrics
+        ]
+        return min(deadlines) if deadlines else None
+        
+    def is_stale(self, metric, now=None):
+        """True if a metric is older than its staleness budget"""
+        last = self.last_collected[metric]
+        if last is None:
+            return True
+        if now is None:
+            now = time.monotonic()
+        return now - last > self.schedule[metric][1]
+        
+    def snapshot(self):
+        """Return an immutable copy of the latest values"""
+        return Snapshot(
+            time.monotonic(), CollectedAt(**self.last_collected),
+            self.cpu_usage, self.cpu_per_core, self.cpu_user,
+            self.cpu_system, self.cpu_iowait, self.ram_usage, self.gpu_usage,
+            self.disk_usage, self.disk_mounts, self.disk_read, self.disk_write,
+            self.disk_read_iops, self.disk_write_iops, self.disk_busy, self.disk_devices,
+            self.network_upload, self.network_download,
+            self.network_upload_smoothed, self.network_download_smoothed,
+            self.network_interfaces, self.temperature,
+            self.temperature_packages, self.temperature_cores,
+            self.top_processes, self.battery_level, self.hud_cpu, self.hud_rss,
+            self.update_interval,
+        )
+        
+    def read_cpu_times(self):
+        """Per-core (total, busy, user, system, iowait) counters"""
+        if self.procfs is not None:
+            return self.procfs.cpu_times()
+        return [self.split_cpu_times(t) for t in psutil.cpu_times(percpu=True)]
         
     def update_cpu(self):
-        self.cpu_usage = int(psutil.cpu_percent(interval=0.1))
+        current = self.read_cpu_times()
+        if self.last_cpu_times is None:
+            self.last_cpu_times = current
+            return
+        per_core = []
+        total_all = busy_all = user_all = system_all = iowait_all = 0.0
+        
+        for last, now in zip(self.last_cpu_times, current):
+            total, busy, user, system, iowait = (b - a for a, b in zip(last, now))
+            per_core.append(self.percent(busy, total))
+            total_all += total
+            busy_all += busy
+            user_all += user
+            system_all += system
+            iowait_all += iowait
+            
+        self.last_cpu_times = current
+        if total_all <= 0:
+            # Called twice within the same clock tick - keep previous values
+            return
+            
+        self.cpu_usage = int(self.percent(busy_all, total_all))
+        self.cpu_per_core = tuple(per_core)
+        self.cpu_user = self.percent(user_all, total_all)
+        self.cpu_system = self.percent(system_all, total_all)
+        self.cpu_iowait = self.percent(iowait_all, total_all)
+        
+    @staticmethod
+    def split_cpu_times(times):
+        """Reduce a cpu_times entry to (total, busy, user, system, iowait)"""
+        # guest time is already accounted in user/nice on Linux
+        total = sum(times) - getattr(times, 'guest', 0) - getattr(times, 'guest_nice', 0)
+        iowait = getattr(times, 'iowait', 0)
+        busy = total - times.idle - iowait
+        return total, busy, times.user, times.system, iowait
+        
+    @staticmethod
+    def percent(part, total):
+        if total <= 0:
+            return 0.0
+        return max(0.0, min(100.0, 100.0 * part / total))
         
     def update_ram(self):
-        self.ram_usage = int(psutil.virtual_memory().percent)
+        percent = self.procfs.memory_percent() if self.procfs is not None else None
+        if percent is None:
+            percent = psutil.virtual_memory().percent
+        self.ram_usage = int(percent)
         
     def update_gpu(self):
         # Simple GPU monitoring - in a real app you might use GPUtil or nvidia-smi
+        if self.cpu_usage is None:
+            return
         try:
             # This is a placeholder - actual implementation would vary
             self.gpu_usage = min(100, self.cpu_usage + 10)  # Fake data for demo
@@ -44,41 +520,227 @@ class SystemMonitor:
             self.gpu_usage = 0
             
     def update_disk(self):
-        self.disk_usage = int(psutil.disk_usage('/').percent)
+        """Capacity of every real mounted filesystem - slow schedule"""
+        mounts = []
+        for partition in psutil.disk_partitions(all=False):
+            if not partition.fstype or 'cdrom' in partition.opts:
+                continue
+            try:
+                usage = psutil.disk_usage(partition.mountpoint)
+            except OSError:
+                continue
+            mounts.append(MountUsage(partition.mountpoint, partition.fstype, usage.total, usage.used, usage.percent))
+        self.disk_mounts = tuple(mounts)
         
-    def update_network(self):
-        current_net_io = psutil.net_io_counters()
-        current_time = time.time()
-        time_diff = current_time - self.last_net_time
+        # Headline value stays the system/root filesystem
+        root = os.path.abspath(os.sep)
+        for mount in mounts:
+            if mount.mountpoint == root:
+                self.disk_usage = int(mount.percent)
+                break
+        else:
+            self.disk_usage = int(max((m.percent for m in mounts), default=0))
+            
+    @staticmethod
+    def find_whole_disks(root='/sys/block'):
+        """Names of whole physical block devices, or None where partitions can't be told apart.
+
+        Stacked devices (LVM/LUKS dm-*, md RAID) list the disks under them in
+        slaves/ and are skipped - their I/O is already counted on those disks.
+        """
+        try:
+            names = os.listdir(root)
+        except OSError:
+            return None
+        disks = set()
+        for name in names:
+            if name.startswith(VIRTUAL_DISK_PREFIXES):
+                continue
+            try:
+                if os.listdir(os.path.join(root, name, 'slaves')):
+                    continue
+            except OSError:
+                pass
+            disks.add(name)
+        return disks
+            
+    def read_disk_counters(self):
+        """Per-device (reads, read_bytes, writes, write_bytes, busy_ms)"""
+        counters = self.procfs.disk_counters() if self.procfs is not None else None
+        if counters is None:
+            try:
+                disks = psutil.disk_io_counters(perdisk=True, nowrap=False) or {}
+            except OSError:  # no diskstats at all - nothing to report
+                disks = {}
+            counters = {}
+            for name, io in disks.items():
+                busy = getattr(io, 'busy_time', io.read_time + io.write_time)
+                counters[name] = (io.read_count, io.read_bytes, io.write_count, io.write_bytes, busy)
+        if self.whole_disks is not None:
+            # Partitions would count the same I/O twice
+            counters = {name: value for name, value in counters.items() if name in self.whole_disks}
+        return counters
+        
+    def update_disk_io(self):
+        """Per-device throughput and IOPS from counter deltas - fast schedule"""
+        counters = self.read_disk_counters()
+        now = time.monotonic()
+        elapsed = now - self.last_disk_time
+        if elapsed <= 0:
+            return
         
-        if time_diff > 0:
-            upload_speed = (current_net_io.bytes_sent - self.last_net_io.bytes_sent) / time_diff
-            download_speed = (current_net_io.bytes_recv - self.last_net_io.bytes_recv) / time_diff
+        devices = []
+        read = write = read_iops = write_iops = busy = 0.0
+        for name, current in counters.items():
+            last = self.last_disk_io.get(name)
+            if last is None:
+                continue
+            reads, read_bytes, writes, write_bytes, busy_ms = (
+                self.counter_delta(a, b) for a, b in zip(last, current)
+            )
+            rate = DiskRate(
+                name, read_bytes / elapsed, write_bytes / elapsed,
+                reads / elapsed, writes / elapsed,
+                min(100.0, busy_ms / elapsed / 10),
+            )
+            devices.append(rate)
+            read += rate.read
+            write += rate.write
+            read_iops += rate.read_iops
+            write_iops += rate.write_iops
+            busy = max(busy, rate.busy)
             
-            self.network_upload = self.format_speed(upload_speed)
-            self.network_download = self.format_speed(download_speed)
+        self.disk_read = read
+        self.disk_write = write
+        self.disk_read_iops = read_iops
+        self.disk_write_iops = write_iops
+        self.disk_busy = busy
+        self.disk_devices = tuple(sorted(devices))
+        self.last_disk_io = counters
+        self.last_disk_time = now
+        
+    def read_network_counters(self):
+        """Per-interface (bytes_recv, bytes_sent) counters"""
+        counters = self.procfs.network_counters() if self.procfs is not None else None
+        if counters is not None:
+            return counters
+        try:
+            interfaces = psutil.net_io_counters(pernic=True, nowrap=False)
+        except OSError:  # no /proc/net/dev at all - nothing to report
+            return {}
+        return {
+            name: (counters.bytes_recv, counters.bytes_sent)
+            for name, counters in interfaces.items()
+        }
+        
+    def update_network(self):
+        counters = self.read_network_counters()
+        now = time.monotonic()
+        elapsed = now - self.last_net_time
+        if elapsed <= 0:
+            return
+        # Time-based EWMA so smoothing does not depend on the sampling rate
+        alpha = 1.0 - math.exp(-elapsed / NETWORK_SMOOTHING)
+        
+        interfaces = []
+        total_down = total_up = 0.0
+        for name, (recv, sent) in counters.items():
+            last = self.last_net_io.get(name)
+            if last is None:
+                # New interface - establish a baseline first
+                down = up = 0.0
+                smooth_down = smooth_up = 0.0
+            else:
+                down = self.counter_delta(last[0], recv) / elapsed
+                up = self.counter_delta(last[1], sent) / elapsed
+                smooth_down, smooth_up = self.net_smoothed.get(name, (down, up))
+                smooth_down += alpha * (down - smooth_down)
+                smooth_up += alpha * (up - smooth_up)
+            self.net_smoothed[name] = (smooth_down, smooth_up)
+            interfaces.append(InterfaceRate(name, down, up, smooth_down, smooth_up))
+            if not self.is_loopback(name):
+                total_down += down
+                total_up += up
+                
+        # Forget interfaces that went away
+        for name in self.net_smoothed.keys() - counters.keys():
+            del self.net_smoothed[name]
             
-        self.last_net_io = current_net_io
-        self.last_net_time = current_time
+        self.network_download = total_down
+        self.network_upload = total_up
+        self.network_download_smoothed += alpha * (total_down - self.network_download_smoothed)
+        self.network_upload_smoothed += alpha * (total_up - self.network_upload_smoothed)
+        self.network_interfaces = tuple(sorted(interfaces))
         
-    def format_speed(self, speed):
-        if speed < 1024:
-            return f"{int(speed)} B/s"
-        elif speed < 1024 * 1024:
-            return f"{int(speed / 1024)} KB/s"
-        else:
-            return f"{int(speed / (1024 * 1024))} MB/s"
+        self.last_net_io = counters
+        self.last_net_time = now
+        
+    @staticmethod
+    def counter_delta(last, current):
+        """Difference of two byte counters, tolerating wrap and resets"""
+        if current >= last:
+            return current - last
+        wrapped = current + 0x100000000 - last
+        if last <= 0xFFFFFFFF and wrapped <= MAX_WRAP_DELTA:
+            # 32-bit counter wrapped around
+            return wrapped
+        # Counter was reset (interface re-created) - no usable delta
+        return 0
+        
+    @staticmethod
+    def is_loopback(name):
+        return name == "lo" or name.startswith("Loopback")
             
     def update_temperature(self):
+        if self.temperature_collector.has_sysfs:
+            reading = self.temperature_collector.read()
+        else:
+            reading = self.read_psutil_temperature()
+            
+        if reading is None:
+            self.temperature = None
+            self.temperature_packages = ()
+            self.temperature_cores = ()
+            return
+        self.temperature_packages, self.temperature_cores = reading
+        self.temperature = max(reading.packages or reading.cores)
+        
+    def read_psutil_temperature(self):
+        """Fallback for platforms without sysfs (not available on Windows or macOS)"""
         try:
-            # This varies by system - might not work on all Windows machines
             temps = psutil.sensors_temperatures()
-            if temps and 'coretemp' in temps:
-                self.temperature = int(temps['coretemp'][0].current)
-            else:
-                self.temperature = 40  # Default fallback
-        except:
-            self.temperature = 40
+        except (AttributeError, OSError):
+            return None
+        for driver in CPU_HWMON_DRIVERS:
+            entries = temps.get(driver)
+            if entries:
+                cores = tuple(e.current for e in entries if e.label.startswith("Core"))
+                packages = tuple(e.current for e in entries if not e.label.startswith("Core"))
+                return TemperatureReading(packages, cores)
+        return None
+            
+    def update_processes(self):
+        started = time.perf_counter()
+        self.top_processes = self.process_collector.sample()
+        self.process_cost = time.perf_counter() - started
+        self.fit_process_period()
+            
+    def read_own_cpu(self):
+        times = self.own_process.cpu_times()
+        return times.user + times.system, time.monotonic()
+        
+    def update_overhead(self):
+        """CPU and memory used by this process (sampler, UI and all)"""
+        cpu_time, now = self.read_own_cpu()
+        last = self.last_own_cpu
+        self.last_own_cpu = (cpu_time, now)
+        self.hud_rss = self.own_process.memory_info().rss
+        if last is None or now <= last[1]:
+            # First run only sets the baseline
+            return
+        self.hud_cpu = 100.0 * (cpu_time - last[0]) / (now - last[1])
+        if self.overhead_budget is not None:
+            self.overhead_budget.observe(self.hud_cpu, now)
             
     def update_battery(self):
         try:
@@ -89,8 +751,3 @@ class SystemMonitor:
                 self.battery_level = 100
         except:
             self.battery_level = 100
-            
-    def update_time(self):
-        now = datetime.datetime.now()
-        self.current_time = now.strftime("%H:%M:%S")
-        self.current_date = now.strftime("%B %d, %Y")
\ No newline at end of file
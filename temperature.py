@@ -0,0 +1,127 @@
+import os
+import time
+from collections import namedtuple
+
+# Per-package and per-core CPU temperatures in degrees Celsius
+TemperatureReading = namedtuple("TemperatureReading", ["packages", "cores"])
+
+# hwmon drivers that report CPU temperatures, in order of preference
+CPU_HWMON_DRIVERS = ("coretemp", "k10temp", "zenpower", "cpu_thermal", "soc_thermal")
+
+# thermal zone types that describe the CPU package, used when no hwmon
+# driver above is present
+CPU_THERMAL_ZONES = ("x86_pkg_temp", "cpu-thermal", "cpu_thermal", "soc_thermal", "soc-thermal")
+
+# When sysfs exists but has no CPU sensor (VMs, unsupported drivers),
+# discovery is retried this often in seconds in case a driver loads late
+REDISCOVER_INTERVAL = 300
+
+class SysfsTemperatureCollector:
+    """Reads CPU temperatures directly from Linux hwmon/thermal sysfs files.
+
+    Sensors are discovered once; the chosen *_input files stay open and are
+    re-read with os.pread at offset 0, which avoids the directory walk and
+    open/close of psutil.sensors_temperatures() on every tick. `root` can
+    point at a fake sysfs tree for testing.
+    """
+    def __init__(self, root="/sys"):
+        self.root = root
+        self.sensors = []  # (kind, label, fd) with kind "package" or "core"
+        # True where sysfs is the place to look - then psutil would only
+        # walk the same directories again
+        self.has_sysfs = hasattr(os, "pread") and os.path.isdir(os.path.join(root, "class"))
+        self.discovered_at = None
+        if self.has_sysfs:
+            self.discover()
+
+    @property
+    def available(self):
+        return bool(self.sensors)
+
+    def discover(self):
+        self.close()
+        self.discovered_at = time.monotonic()
+        found = self.discover_hwmon() or self.discover_thermal_zones()
+        for kind, label, path in found:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                continue
+            self.sensors.append((kind, label, fd))
+
+    def discover_hwmon(self):
+        base = os.path.join(self.root, "class", "hwmon")
+        by_driver = {}
+        for entry in self.list_dir(base):
+            path = os.path.join(base, entry)
+            name = self.read_text(os.path.join(path, "name"))
+            if name in CPU_HWMON_DRIVERS:
+                by_driver.setdefault(name, []).append(path)
+
+        for driver in CPU_HWMON_DRIVERS:
+            sensors = []
+            # one hwmon directory per package on multi-socket systems
+            for path in sorted(by_driver.get(driver, ())):
+                inputs = sorted(
+                    (f for f in self.list_dir(path) if f.startswith("temp") and f.endswith("_input")),
+                    key=lambda f: int(f[4:-6] or 0),
+                )
+                for input_file in inputs:
+                    prefix = input_file[:-len("_input")]
+                    label = self.read_text(os.path.join(path, prefix + "_label")) or driver
+                    kind = "core" if label.startswith("Core") else "package"
+                    sensors.append((kind, label, os.path.join(path, input_file)))
+            if sensors:
+                return sensors
+        return []
+
+    def discover_thermal_zones(self):
+        base = os.path.join(self.root, "class", "thermal")
+        sensors = []
+        for entry in sorted(self.list_dir(base)):
+            if not entry.startswith("thermal_zone"):
+                continue
+            path = os.path.join(base, entry)
+            zone_type = self.read_text(os.path.join(path, "type"))
+            if zone_type in CPU_THERMAL_ZONES:
+                sensors.append(("package", zone_type, os.path.join(path, "temp")))
+        return sensors
+
+    def read(self):
+        """Return a TemperatureReading, or None if no sensor can be read"""
+        if not self.sensors and self.has_sysfs and time.monotonic() - self.discovered_at >= REDISCOVER_INTERVAL:
+            self.discover()
+        packages = []
+        cores = []
+        for kind, label, fd in self.sensors:
+            try:
+                value = int(os.pread(fd, 32, 0)) / 1000.0
+            except (OSError, ValueError):
+                continue
+            (cores if kind == "core" else packages).append(value)
+        if not packages and not cores:
+            return None
+        return TemperatureReading(tuple(packages), tuple(cores))
+
+    def close(self):
+        for _, _, fd in self.sensors:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self.sensors = []
+
+    @staticmethod
+    def list_dir(path):
+        try:
+            return os.listdir(path)
+        except OSError:
+            return []
+
+    @staticmethod
+    def read_text(path):
+        try:
+            with open(path) as f:
+                return f.read().strip()
+        except OSError:
+            return None
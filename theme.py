@@ -0,0 +1,153 @@
+from string import Template
+from PyQt5.QtGui import QColor
+
+# Color tokens per theme. `ink` is the RGB triple used for translucent text
+# and borders, `text` the solid foreground color.
+THEME_COLORS = {
+    "dark": {
+        "ink": "255, 255, 255",
+        "text": "white",
+        "main_top": "rgba(25, 25, 35, 230)",
+        "main_bottom": "rgba(15, 15, 25, 230)",
+        "card": "rgba(45, 45, 55, 160)",
+        "widget_bg": "rgba(30, 30, 40, 200)",
+    },
+    "light": {
+        "ink": "0, 0, 0",
+        "text": "#333333",
+        "main_top": "rgba(245, 245, 250, 230)",
+        "main_bottom": "rgba(230, 230, 240, 230)",
+        "card": "rgba(250, 250, 255, 160)",
+        "widget_bg": "rgba(240, 240, 245, 200)",
+    },
+}
+
+STYLESHEETS = {
+    "main_window": Template("""
+        QWidget {
+            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                stop:0 $main_top,
+                stop:1 $main_bottom);
+            color: $text;
+            border-radius: 12px;
+        }
+        #compactCard {
+            background: $card;
+            border: 1px solid rgba($ink, 20);
+            border-radius: 8px;
+        }
+        #compactTitle {
+            color: rgba($ink, 160);
+            font-size: 10px;
+            font-weight: bold;
+        }
+        #compactValue {
+            color: $text;
+            font-size: 14px;
+            font-weight: bold;
+        }
+        #compactRate {
+            color: $text;
+            font-size: 11px;
+            font-weight: bold;
+        }
+    """),
+    "floating_widget": Template("""
+        QWidget {
+            background: $widget_bg;
+            color: $text;
+            border: 1px solid rgba($ink, 40);
+            border-radius: 10px;
+        }
+        #widgetTitle {
+            color: rgba($ink, 180);
+            font-size: 11px;
+            font-weight: bold;
+        }
+        #widgetMetricTitle {
+            color: rgba($ink, 140);
+            font-size: 9px;
+            font-weight: bold;
+        }
+        #widgetMetricValue {
+            color: $text;
+            font-size: 12px;
+            font-weight: bold;
+        }
+        #widgetTime {
+            color: rgba($ink, 200);
+            font-size: 14px;
+            font-weight: bold;
+        }
+        #widgetMenuBtn, #widgetCloseBtn {
+            background: transparent;
+            color: rgba($ink, 180);
+            border: none;
+            border-radius: 3px;
+            font-size: 12px;
+            font-weight: bold;
+        }
+        #widgetMenuBtn:hover {
+            background: rgba($ink, 30);
+        }
+        #widgetCloseBtn:hover {
+            background: rgba(255, 0, 0, 100);
+            color: white;
+        }
+    """),
+    "diagnostics": Template("""
+        QWidget {
+            background: $main_bottom;
+            color: $text;
+        }
+        QTableWidget {
+            background: $card;
+            gridline-color: rgba($ink, 20);
+            border: 1px solid rgba($ink, 20);
+        }
+        QHeaderView::section {
+            background: $card;
+            color: rgba($ink, 160);
+            border: none;
+            padding: 2px 6px;
+            font-weight: bold;
+        }
+        QPushButton {
+            background: rgba($ink, 20);
+            border: 1px solid rgba($ink, 40);
+            border-radius: 4px;
+            padding: 4px 10px;
+        }
+        QPushButton:hover {
+            background: rgba($ink, 40);
+        }
+    """),
+}
+
+class Theme:
+    """Colors of one theme plus the stylesheets compiled from them.
+
+    Stylesheets are rendered once per component and reused, and painted
+    widgets take their colors from here instead of from CSS.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.colors = THEME_COLORS[name]
+        ink = [int(c) for c in self.colors["ink"].split(",")]
+        self.track_color = QColor(*ink, 20)
+        self.stylesheets = {}
+
+    def stylesheet(self, component):
+        if component not in self.stylesheets:
+            self.stylesheets[component] = STYLESHEETS[component].substitute(self.colors)
+        return self.stylesheets[component]
+
+_themes = {}
+
+def get_theme(name):
+    """Return the cached Theme for `name`, falling back to dark"""
+    if name not in THEME_COLORS:
+        name = "dark"
+    if name not in _themes:
+        _themes[name] = Theme(name)
+    return _themes[name]
@@ -0,0 +1,117 @@
+import os
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog)
+from PyQt5.QtCore import Qt, QTimer
+from theme import get_theme
+
+# (header, summary key, format)
+COLUMNS = (
+    ("Name", "name", "{}"),
+    ("Calls", "calls", "{}"),
+    ("Rate/s", "rate", "{:.2f}"),
+    ("Timed", "samples", "{}"),
+    ("p50 µs", "p50_us", "{:.1f}"),
+    ("p99 µs", "p99_us", "{:.1f}"),
+    ("Max µs", "max_us", "{:.1f}"),
+    ("Errors", "errors", "{}"),
+)
+
+class DiagnosticsPanel(QWidget):
+    """Live table of the monitor's timing histograms, opened from the tray.
+
+    Refreshes once a second while visible and can export the numbers as
+    JSON. Rows marked "(sampled)" are timed on a fraction of their calls
+    only, so their percentiles rest on the "Timed" column, not on "Calls".
+    """
+    REFRESH_MS = 1000
+
+    def __init__(self, timings, export_dir):
+        super().__init__(None, Qt.Tool | Qt.WindowStaysOnTopHint)
+        self.timings = timings
+        self.export_dir = export_dir
+        self.theme_name = None
+        self.setWindowTitle("AeroSys HUD - Diagnostics")
+        self.resize(520, 360)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels([header for header, _, _ in COLUMNS])
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.verticalHeader().setDefaultSectionSize(20)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+
+        self.tick_label = QLabel()
+        layout.addWidget(self.tick_label)
+
+        buttons = QHBoxLayout()
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset)
+        export_btn = QPushButton("Export JSON…")
+        export_btn.clicked.connect(self.export)
+        buttons.addStretch()
+        buttons.addWidget(reset_btn)
+        buttons.addWidget(export_btn)
+        layout.addLayout(buttons)
+
+    def apply_theme(self, theme):
+        if theme == self.theme_name:
+            return
+        self.theme_name = theme
+        self.setStyleSheet(get_theme(theme).stylesheet("diagnostics"))
+
+    def refresh(self):
+        rows = self.timings.summary()
+        self.table.setRowCount(len(rows))
+        for row, summary in enumerate(rows):
+            for column, (_, key, fmt) in enumerate(COLUMNS):
+                value = summary[key]
+                text = "-" if value is None else fmt.format(value)
+                if key == "name" and summary["sampled"]:
+                    text += " (sampled)"
+                item = self.table.item(row, column)
+                if item is None:
+                    item = QTableWidgetItem()
+                    if column:
+                        item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                    self.table.setItem(row, column, item)
+                if item.text() != text:
+                    item.setText(text)
+
+        tick = next((s for s in rows if s["name"] == "tick"), None)
+        if tick and tick["mean_us"]:
+            self.tick_label.setText(f"Sampling tick: {tick['mean_us']:.0f} µs mean of {tick['samples']} timed, {tick['rate']:.2f}/s")
+        else:
+            self.tick_label.setText("Sampling tick: no samples yet")
+
+    def reset(self):
+        self.timings.reset()
+        self.refresh()
+
+    def export(self):
+        default = os.path.join(self.export_dir, "diagnostics.json")
+        path, _ = QFileDialog.getSaveFileName(self, "Export timings", default, "JSON (*.json)")
+        if not path:
+            return
+        try:
+            self.timings.export(path)
+        except OSError as e:
+            print(f"Failed to export timings: {e}")
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start(self.REFRESH_MS)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
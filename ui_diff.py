@@ -0,0 +1,49 @@
+class DisplayDiff:
+    """Pushes formatted values to widgets only when they actually change.
+
+    setText() invalidates the label's layout and schedules a repaint even
+    when the text is identical, so every update goes through here and is
+    compared against what the widget currently shows. changed() is the
+    same check for anything else keyed by value, such as the collection
+    stamp a graph advances on. The counters let us check how much work is
+    being skipped.
+    """
+    def __init__(self):
+        self.shown = {}
+        self.updated = 0
+        self.skipped = 0
+
+    def changed(self, key, value):
+        """Remember `value` for `key`, return True if it differs from the last one"""
+        if self.shown.get(key) == value:
+            self.skipped += 1
+            return False
+        self.shown[key] = value
+        self.updated += 1
+        return True
+
+    def set_text(self, label, text):
+        """Set label text if it differs from the last value, return True if set"""
+        if not self.changed(label, text):
+            return False
+        label.setText(text)
+        return True
+
+    def forget(self, label=None):
+        """Drop cached text so the next set_text() always applies"""
+        if label is None:
+            self.shown.clear()
+        else:
+            self.shown.pop(label, None)
+
+    def stats(self):
+        total = self.updated + self.skipped
+        return {
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "skip_ratio": self.skipped / total if total else 0.0,
+        }
+
+    def reset_counters(self):
+        self.updated = 0
+        self.skipped = 0
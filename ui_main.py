@@ -1,7 +1,39 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                             QPushButton, QFrame, QGridLayout)
-from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, pyqtProperty, QTimer, QSize
-from PyQt5.QtGui import QPainter, QLinearGradient, QFont
+from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, pyqtProperty, QTimer, QSize, QRectF, QPointF
+from PyQt5.QtGui import QPainter, QLinearGradient, QFont, QColor, QPixmap, QPolygonF
+import time
+from collections import deque
+from theme import get_theme
+from ui_diff import DisplayDiff
+
+def format_speed(speed):
+    """Compact byte rate for the NET card, e.g. 340B, 12K, 1.5M.
+
+    Never more than three digits: 1000-1023 already show as the next unit.
+    """
+    for unit in ("B", "K", "M"):
+        if speed < 1000:
+            break
+        speed /= 1024
+    else:
+        unit = "G"
+    if unit != "B" and speed < 10:
+        return f"{speed:.1f}{unit}"
+    return f"{int(speed)}{unit}"
+
+def process_table(rows, column):
+    """Tooltip text listing the top processes by one ProcessInfo column"""
+    lines = []
+    for row in rows:
+        if column == "cpu":
+            value = f"{row.cpu:.1f}%"
+        elif column == "rss":
+            value = format_speed(row.rss)
+        else:
+            value = format_speed(row.io) + "/s"
+        lines.append(f"{row.name} ({row.pid})  {value}")
+    return "\n".join(lines)
 
 class AnimatedLabel(QLabel):
     def __init__(self, text=""):
@@ -57,11 +89,186 @@ class CircularProgress(QWidget):
         painter.setFont(QFont("Arial", 10, QFont.Bold))
         painter.drawText(self.rect(), Qt.AlignCenter, f"{self.value}%")
 
+class CoreBars(QWidget):
+    """Row of thin vertical bars, one per CPU core"""
+    def __init__(self, color="#3498db", parent=None):
+        super().__init__(parent)
+        self.values = ()
+        self.color = QColor(color)
+        self.track_color = QColor(255, 255, 255, 20)
+        self.setFixedHeight(16)
+        
+    def set_values(self, values):
+        if values != self.values:
+            self.values = values
+            self.update()
+            
+    def set_track_color(self, color):
+        self.track_color = QColor(color)
+        self.update()
+        
+    def paintEvent(self, event):
+        if not self.values:
+            return
+        painter = QPainter(self)
+        painter.setPen(Qt.NoPen)
+        
+        count = len(self.values)
+        gap = 2 if count <= 16 else 1
+        bar_width = max(1.0, (self.width() - gap * (count - 1)) / count)
+        height = self.height()
+        
+        for i, value in enumerate(self.values):
+            x = i * (bar_width + gap)
+            filled = height * value / 100
+            painter.fillRect(QRectF(x, 0, bar_width, height), self.track_color)
+            painter.fillRect(QRectF(x, height - filled, bar_width, filled), self.color)
+
+class Sparkline(QWidget):
+    """Mini progress bar with a scrolling history graph above it.
+
+    The graph lives in a cached pixmap. Each new sample scrolls the pixmap
+    left by one step and draws only the newest column, so the cost per tick
+    does not depend on how much history is visible.
+    """
+    def __init__(self, color, parent=None, step=3, bar_height=3):
+        super().__init__(parent)
+        self.color = QColor(color)
+        self.fill_color = QColor(self.color)
+        self.fill_color.setAlpha(60)
+        self.track_color = QColor(255, 255, 255, 20)
+        self.step = step
+        self.bar_height = bar_height
+        self.value = 0
+        self.samples = deque(maxlen=64)  # replayed when the pixmap is rebuilt
+        self.live_samples = None  # live samples kept aside while a fixed series is shown
+        self.pixmap = None
+        self.setFixedHeight(14)
+        
+    def set_track_color(self, color):
+        self.track_color = QColor(color)
+        self.update()
+        
+    def graph_height(self):
+        return max(1, self.height() - self.bar_height - 1)
+        
+    def push(self, value, bar_value=None):
+        """Append a graph sample (0-100) and update the bar.
+        
+        `bar_value` lets the bar show a different quantity than the graph,
+        e.g. disk capacity under a busy-time graph.
+        """
+        value = max(0, min(100, value))
+        self.value = value if bar_value is None else max(0, min(100, bar_value))
+        if self.live_samples is not None:
+            # Showing a fixed series - only the bar follows live values
+            self.live_samples.append(value)
+            self.update()
+            return
+        previous = self.samples[-1] if self.samples else value
+        self.samples.append(value)
+        
+        if self.pixmap is None:
+            self.rebuild_pixmap()
+        else:
+            self.scroll_in(previous, value)
+        self.update()
+        
+    def show_series(self, values):
+        """Replace the graph with a fixed series of 0-100 values, oldest first"""
+        if self.live_samples is None:
+            self.live_samples = self.samples
+        self.samples = deque((max(0, min(100, v)) for v in values), maxlen=max(1, len(values)))
+        self.pixmap = None
+        self.update()
+        
+    def show_live(self):
+        """Go back to scrolling live samples"""
+        if self.live_samples is not None:
+            self.samples = self.live_samples
+            self.live_samples = None
+            self.pixmap = None
+            self.update()
+        
+    def visible_samples(self):
+        return self.width() // self.step + 1
+        
+    def rebuild_pixmap(self):
+        """Redraw the whole graph from the retained samples"""
+        ratio = self.devicePixelRatioF()
+        self.pixmap = QPixmap(int(self.width() * ratio), int(self.graph_height() * ratio))
+        self.pixmap.setDevicePixelRatio(ratio)
+        self.pixmap.fill(Qt.transparent)
+        
+        samples = list(self.samples)[-self.visible_samples():]
+        for previous, value in zip(samples, samples[1:]):
+            self.scroll_in(previous, value)
+            
+    def scroll_in(self, previous, value):
+        ratio = self.pixmap.devicePixelRatio()
+        dx = int(self.step * ratio)
+        self.pixmap.scroll(-dx, 0, self.pixmap.rect())
+        
+        width = self.width()
+        height = self.graph_height()
+        x0 = width - self.step
+        y0 = height - height * previous / 100
+        y1 = height - height * value / 100
+        
+        painter = QPainter(self.pixmap)
+        # Clear the column exposed by the scroll
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.fillRect(QRectF(x0, 0, self.step, height), Qt.transparent)
+        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+        painter.setRenderHint(QPainter.Antialiasing)
+        
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(self.fill_color)
+        painter.drawPolygon(QPolygonF([
+            QPointF(x0, height), QPointF(x0, y0), QPointF(width, y1), QPointF(width, height)
+        ]))
+        painter.setPen(self.color)
+        painter.drawLine(QPointF(x0, y0), QPointF(width, y1))
+        painter.end()
+        
+    def resizeEvent(self, event):
+        self.pixmap = None
+        super().resizeEvent(event)
+        
+    def paintEvent(self, event):
+        if self.pixmap is None and self.samples:
+            self.rebuild_pixmap()
+            
+        painter = QPainter(self)
+        if self.pixmap is not None:
+            painter.drawPixmap(0, 0, self.pixmap)
+            
+        # Progress bar along the bottom edge
+        bar = QRectF(0, self.height() - self.bar_height, self.width(), self.bar_height)
+        painter.setPen(Qt.NoPen)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setBrush(self.track_color)
+        painter.drawRoundedRect(bar, 1.5, 1.5)
+        if self.value > 0:
+            painter.setBrush(self.color)
+            painter.drawRoundedRect(QRectF(bar.x(), bar.y(), bar.width() * self.value / 100, bar.height()), 1.5, 1.5)
+
 class MainWindow(QWidget):
+    # Metrics this view displays - collected only while it is visible
+    METRICS = ("cpu", "ram", "gpu", "disk", "disk_io", "network", "temperature", "processes", "overhead")
+    
+    # Graph ranges the footer button cycles through: (seconds, label), None = live
+    HISTORY_RANGES = ((None, "Live"), (24 * 60 * 60, "24h"), (7 * 24 * 60 * 60, "7d"))
+    
     def __init__(self, system_monitor, settings):
         super().__init__()
         self.system_monitor = system_monitor
         self.settings = settings
+        self.theme_name = None
+        self.display_diff = DisplayDiff()
+        self.history_range = 0  # index into HISTORY_RANGES
+        self.history_refreshed = 0.0
+        self.shown_processes = None  # top_processes behind the current tooltips
         self.init_ui()
         
     def init_ui(self):
@@ -104,6 +311,9 @@ class MainWindow(QWidget):
         self.net_card = self.create_compact_card("NET", "#2ecc71")
         self.temp_card = self.create_compact_card("TEMP", "#e67e22")
         self.disk_card = self.create_compact_card("DISK", "#f39c12")
+        # Two rates per label - a smaller font keeps "↓999M ↑999M" inside the card
+        for card in (self.net_card, self.disk_card):
+            card.value_label.setObjectName("compactRate")
         
         # Add to grid - 2 columns
         grid_layout.addWidget(self.cpu_card, 0, 0)
@@ -115,6 +325,10 @@ class MainWindow(QWidget):
         
         main_layout.addLayout(grid_layout)
         
+        # Per-core CPU load
+        self.core_bars = CoreBars(self.cpu_card.color)
+        main_layout.addWidget(self.core_bars)
+        
         # Time display - minimal
         time_layout = QVBoxLayout()
         
@@ -138,7 +352,27 @@ class MainWindow(QWidget):
         self.theme_btn = self.create_small_button("Theme")
         self.theme_btn.clicked.connect(lambda: self.window().toggle_theme())
         
+        # Effective refresh interval (varies in adaptive mode)
+        self.rate_label = AnimatedLabel("1.0s")
+        self.rate_label.setObjectName("compactTitle")
+        self.rate_label.setAlignment(Qt.AlignCenter)
+        self.rate_label.setToolTip("Refresh interval")
+        
+        # The HUD's own CPU use, memory in the tooltip
+        self.overhead_label = AnimatedLabel("HUD 0%")
+        self.overhead_label.setObjectName("compactTitle")
+        self.overhead_label.setAlignment(Qt.AlignCenter)
+        
+        # Graph range - needs the on-disk history
+        self.range_btn = self.create_small_button("Live")
+        self.range_btn.setToolTip("Graph range")
+        self.range_btn.clicked.connect(self.cycle_history_range)
+        self.range_btn.setVisible(self.system_monitor.history_store is not None)
+        
         footer_layout.addWidget(self.widget_btn)
+        footer_layout.addWidget(self.rate_label)
+        footer_layout.addWidget(self.overhead_label)
+        footer_layout.addWidget(self.range_btn)
         footer_layout.addWidget(self.theme_btn)
         
         main_layout.addLayout(footer_layout)
@@ -188,7 +422,7 @@ class MainWindow(QWidget):
         
         layout = QVBoxLayout()
         layout.setContentsMargins(8, 8, 8, 8)
-        layout.setSpacing(4)
+        layout.setSpacing(2)
         
         # Title
         title_label = AnimatedLabel(title)
@@ -200,10 +434,8 @@ class MainWindow(QWidget):
         value_label.setObjectName("compactValue")
         value_label.setAlignment(Qt.AlignCenter)
         
-        # Mini progress bar
-        progress = QFrame()
-        progress.setFixedHeight(4)
-        progress.setObjectName("miniProgress")
+        # Mini progress bar with history graph
+        progress = Sparkline(color)
         
         layout.addWidget(title_label)
         layout.addWidget(value_label)
@@ -220,93 +452,111 @@ class MainWindow(QWidget):
         return card
         
     def apply_theme(self, theme):
-        if theme == "dark":
-            self.setStyleSheet("""
-                QWidget {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 rgba(25, 25, 35, 230), 
-                        stop:1 rgba(15, 15, 25, 230));
-                    color: white;
-                    border-radius: 12px;
-                }
-                #compactCard {
-                    background: rgba(45, 45, 55, 160);
-                    border: 1px solid rgba(255, 255, 255, 20);
-                    border-radius: 8px;
-                }
-                #compactTitle {
-                    color: rgba(255, 255, 255, 160);
-                    font-size: 10px;
-                    font-weight: bold;
-                }
-                #compactValue {
-                    color: white;
-                    font-size: 14px;
-                    font-weight: bold;
-                }
-                #miniProgress {
-                    background: rgba(255, 255, 255, 20);
-                    border-radius: 2px;
-                }
-            """)
-        else:
-            self.setStyleSheet("""
-                QWidget {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 rgba(245, 245, 250, 230), 
-                        stop:1 rgba(230, 230, 240, 230));
-                    color: #333333;
-                    border-radius: 12px;
-                }
-                #compactCard {
-                    background: rgba(250, 250, 255, 160);
-                    border: 1px solid rgba(0, 0, 0, 20);
-                    border-radius: 8px;
-                }
-                #compactTitle {
-                    color: rgba(0, 0, 0, 160);
-                    font-size: 10px;
-                    font-weight: bold;
-                }
-                #compactValue {
-                    color: #333333;
-                    font-size: 14px;
-                    font-weight: bold;
-                }
-                #miniProgress {
-                    background: rgba(0, 0, 0, 20);
-                    border-radius: 2px;
-                }
-            """)
+        # Re-polishing the whole window is only worth it on an actual change
+        if theme == self.theme_name:
+            return
+        self.theme_name = theme
+        style = get_theme(theme)
+        self.core_bars.set_track_color(style.track_color)
+        for card in (self.cpu_card, self.ram_card, self.gpu_card, self.net_card, self.temp_card, self.disk_card):
+            card.progress.set_track_color(style.track_color)
+        self.setStyleSheet(style.stylesheet("main_window"))
             
-    def update_display(self):
-        # Update all compact cards
-        self.update_compact_card(self.cpu_card, self.system_monitor.cpu_usage)
-        self.update_compact_card(self.ram_card, self.system_monitor.ram_usage)
-        self.update_compact_card(self.gpu_card, self.system_monitor.gpu_usage)
-        self.update_compact_card(self.disk_card, self.system_monitor.disk_usage)
+    def update_display(self, snapshot):
+        # Update all compact cards; a graph only moves on a fresh reading
+        collected_at = snapshot.collected_at
+        self.update_compact_card(self.cpu_card, snapshot.cpu_usage, self.is_fresh(collected_at, "cpu"))
+        self.update_compact_card(self.ram_card, snapshot.ram_usage, self.is_fresh(collected_at, "ram"))
+        self.update_compact_card(self.gpu_card, snapshot.gpu_usage, self.is_fresh(collected_at, "gpu"))
+        self.core_bars.set_values(snapshot.cpu_per_core)
         
         # Network special case
-        net_up = self.system_monitor.network_upload
-        net_down = self.system_monitor.network_download
-        self.net_card.value_label.setText(f"{net_up.split()[0]}↑")
+        net_down = format_speed(snapshot.network_download_smoothed)
+        net_up = format_speed(snapshot.network_upload_smoothed)
+        self.display_diff.set_text(self.net_card.value_label, f"↓{net_down} ↑{net_up}")
+        
+        # Disk: throughput in the label, capacity in the bar, busy time in the graph
+        disk_read = format_speed(snapshot.disk_read)
+        disk_write = format_speed(snapshot.disk_write)
+        self.display_diff.set_text(self.disk_card.value_label, f"R{disk_read} W{disk_write}")
+        if self.is_fresh(collected_at, "disk_io"):
+            self.disk_card.progress.push(snapshot.disk_busy, snapshot.disk_usage)
         
         # Temperature
-        temp = self.system_monitor.temperature
-        self.temp_card.value_label.setText(f"{temp}°")
-        
-        # Time and date
-        self.time_label.setText(self.system_monitor.current_time)
-        self.date_label.setText(self.system_monitor.current_date)
-        
-    def update_compact_card(self, card, value):
-        card.value_label.setText(f"{value}%")
-        # Update mini progress bar
-        card.progress.setStyleSheet(f"""
-            #miniProgress {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 {card.color}, stop:{max(0.01, value/100)} {card.color},
-                    stop:{max(0.01, value/100)} rgba(255, 255, 255, 20), stop:1 rgba(255, 255, 255, 20));
-                border-radius: 2px;
-            }}
-        """)
\ No newline at end of file
+        temp = snapshot.temperature
+        self.display_diff.set_text(self.temp_card.value_label, "N/A" if temp is None else f"{temp:.0f}°")
+        
+        self.display_diff.set_text(self.rate_label, f"{snapshot.update_interval:g}s")
+        hud_cpu = snapshot.hud_cpu
+        self.display_diff.set_text(self.overhead_label, "HUD N/A" if hud_cpu is None else f"HUD {hud_cpu:.1f}%")
+        if hud_cpu is not None:
+            self.set_tooltip(self.overhead_label,
+                             f"AeroSys HUD: {hud_cpu:.1f}% of one core, {format_speed(snapshot.hud_rss)} resident")
+        
+        # Top processes behind the CPU, RAM and DISK cards - only refreshed
+        # every few seconds, so most snapshots carry the same object
+        top = snapshot.top_processes
+        if top is not None and top is not self.shown_processes:
+            self.shown_processes = top
+            self.set_tooltip(self.cpu_card, process_table(top.cpu, "cpu"))
+            self.set_tooltip(self.ram_card, process_table(top.memory, "rss"))
+            self.set_tooltip(self.disk_card, process_table(top.io, "io"))
+            
+        # Stored-history graphs move one bucket at a time
+        seconds = self.HISTORY_RANGES[self.history_range][0]
+        if seconds is not None and time.time() - self.history_refreshed >= seconds / self.cpu_card.progress.visible_samples():
+            self.show_history()
+            
+    def history_cards(self):
+        """(card, stored field) pairs whose graphs can show stored history"""
+        return (
+            (self.cpu_card, "cpu_usage"),
+            (self.ram_card, "ram_usage"),
+            (self.gpu_card, "gpu_usage"),
+            (self.disk_card, "disk_busy"),
+        )
+        
+    def cycle_history_range(self):
+        self.history_range = (self.history_range + 1) % len(self.HISTORY_RANGES)
+        seconds, label = self.HISTORY_RANGES[self.history_range]
+        self.range_btn.setText(label)
+        if seconds is None:
+            for card, _ in self.history_cards():
+                card.progress.show_live()
+        else:
+            self.show_history()
+            
+    def show_history(self):
+        """Load the selected range from the history store into the graphs"""
+        store = self.system_monitor.history_store
+        seconds = self.HISTORY_RANGES[self.history_range][0]
+        now = time.time()
+        for card, field in self.history_cards():
+            series = store.series(field, seconds, card.progress.visible_samples(), now)
+            card.progress.show_series([0 if value is None else value for value in series])
+        self.history_refreshed = now
+            
+    def set_tooltip(self, card, text):
+        if card.toolTip() != text:
+            card.setToolTip(text)
+        
+    def update_clock(self, now):
+        """Redraw time and date - driven by the second-aligned scheduler"""
+        self.display_diff.set_text(self.time_label, now.strftime("%H:%M:%S"))
+        self.display_diff.set_text(self.date_label, now.strftime("%B %d, %Y"))
+        
+    def is_fresh(self, collected_at, metric):
+        """True if `metric` was collected since the last snapshot shown"""
+        if collected_at is None:
+            # Recording without collection stamps - every snapshot is new
+            return True
+        return self.display_diff.changed(metric, getattr(collected_at, metric))
+        
+    def update_compact_card(self, card, value, fresh=True):
+        if value is None:
+            # No reading yet
+            self.display_diff.set_text(card.value_label, "N/A")
+            return
+        self.display_diff.set_text(card.value_label, f"{value}%")
+        if fresh:
+            card.progress.push(value)
\ No newline at end of file
@@ -0,0 +1,48 @@
+import time
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+class ReplayPlayer(QObject):
+    """Feeds recorded snapshots to the views in place of the sampler.
+
+    `speed` scales the recorded timing (1 = real time, 10 = ten times
+    faster); None plays as fast as the event loop allows, one frame per
+    loop iteration so every frame is laid out and painted. finished is
+    emitted with the number of frames and the frames per second achieved.
+    """
+    finished = pyqtSignal(int, float)
+
+    def __init__(self, records, callback, speed=1.0, parent=None):
+        super().__init__(parent)
+        self.records = records
+        self.callback = callback
+        self.speed = speed
+        self.position = 0
+        self.started = None
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.next_frame)
+
+    def start(self):
+        self.position = 0
+        self.started = time.perf_counter()
+        self.timer.start(0)
+
+    def stop(self):
+        self.timer.stop()
+
+    def next_frame(self):
+        if self.position >= len(self.records):
+            elapsed = time.perf_counter() - self.started
+            frames = len(self.records)
+            self.finished.emit(frames, frames / elapsed if elapsed > 0 else 0.0)
+            return
+        self.callback(self.records[self.position][1])
+        self.position += 1
+
+        delay = 0.0
+        if self.speed is not None and self.position < len(self.records):
+            # Due times come from the recording, so slow frames don't add drift
+            first = self.records[0][0]
+            due = self.started + (self.records[self.position][0] - first) / self.speed
+            delay = max(0.0, due - time.perf_counter())
+        self.timer.start(int(delay * 1000))
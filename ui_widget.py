@@ -1,21 +1,26 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QFrame, QHBoxLayout, QPushButton
-from PyQt5.QtCore import Qt, QTimer, QPoint, QSize
+from PyQt5.QtCore import Qt, QPoint, QSize
 from PyQt5.QtGui import QMouseEvent, QFont, QPainter, QColor
+from ui_main import CoreBars
+from theme import get_theme
+from ui_diff import DisplayDiff
 
 class FloatingWidget(QWidget):
-    def __init__(self, system_monitor, settings):
+    # Metrics this view displays - collected only while it is visible
+    METRICS = ("cpu", "ram")
+    
+    def __init__(self, system_monitor, settings, scheduler):
         super().__init__()
         self.system_monitor = system_monitor
         self.settings = settings
+        self.scheduler = scheduler
         self.dragging = False
         self.drag_position = QPoint()
         self.resize_edge = None
         self.minimum_size = QSize(150, 100)
         self.auto_hide = False
-        
-        # Auto-hide timer
-        self.auto_hide_timer = QTimer()
-        self.auto_hide_timer.timeout.connect(self.hide_widget)
+        self.theme_name = None
+        self.display_diff = DisplayDiff()
         
         self.init_ui()
         self.apply_theme(self.settings.theme)
@@ -26,6 +31,7 @@ class FloatingWidget(QWidget):
         self.setAttribute(Qt.WA_TranslucentBackground)
         self.setMinimumSize(self.minimum_size)
         self.resize(180, 120)
+        self.move(*self.settings.widget_position)
         
         layout = QVBoxLayout()
         layout.setContentsMargins(12, 12, 12, 12)
@@ -90,6 +96,11 @@ class FloatingWidget(QWidget):
         
         layout.addLayout(metrics_layout)
         
+        # Per-core CPU load
+        self.core_bars = CoreBars("#3498db")
+        self.core_bars.setFixedHeight(10)
+        layout.addWidget(self.core_bars)
+        
         # Time
         self.time_label = QLabel("00:00:00")
         self.time_label.setAlignment(Qt.AlignCenter)
@@ -107,94 +118,12 @@ class FloatingWidget(QWidget):
         self.setMouseTracking(True)
         
     def apply_theme(self, theme):
-        if theme == "dark":
-            self.setStyleSheet("""
-                QWidget {
-                    background: rgba(30, 30, 40, 200);
-                    color: white;
-                    border: 1px solid rgba(255, 255, 255, 40);
-                    border-radius: 10px;
-                }
-                #widgetTitle {
-                    color: rgba(255, 255, 255, 180);
-                    font-size: 11px;
-                    font-weight: bold;
-                }
-                #widgetMetricTitle {
-                    color: rgba(255, 255, 255, 140);
-                    font-size: 9px;
-                    font-weight: bold;
-                }
-                #widgetMetricValue {
-                    color: white;
-                    font-size: 12px;
-                    font-weight: bold;
-                }
-                #widgetTime {
-                    color: rgba(255, 255, 255, 200);
-                    font-size: 14px;
-                    font-weight: bold;
-                }
-                #widgetMenuBtn, #widgetCloseBtn {
-                    background: transparent;
-                    color: rgba(255, 255, 255, 180);
-                    border: none;
-                    border-radius: 3px;
-                    font-size: 12px;
-                    font-weight: bold;
-                }
-                #widgetMenuBtn:hover {
-                    background: rgba(255, 255, 255, 30);
-                }
-                #widgetCloseBtn:hover {
-                    background: rgba(255, 0, 0, 100);
-                    color: white;
-                }
-            """)
-        else:
-            self.setStyleSheet("""
-                QWidget {
-                    background: rgba(240, 240, 245, 200);
-                    color: #333333;
-                    border: 1px solid rgba(0, 0, 0, 40);
-                    border-radius: 10px;
-                }
-                #widgetTitle {
-                    color: rgba(0, 0, 0, 180);
-                    font-size: 11px;
-                    font-weight: bold;
-                }
-                #widgetMetricTitle {
-                    color: rgba(0, 0, 0, 140);
-                    font-size: 9px;
-                    font-weight: bold;
-                }
-                #widgetMetricValue {
-                    color: #333333;
-                    font-size: 12px;
-                    font-weight: bold;
-                }
-                #widgetTime {
-                    color: rgba(0, 0, 0, 200);
-                    font-size: 14px;
-                    font-weight: bold;
-                }
-                #widgetMenuBtn, #widgetCloseBtn {
-                    background: transparent;
-                    color: rgba(0, 0, 0, 180);
-                    border: none;
-                    border-radius: 3px;
-                    font-size: 12px;
-                    font-weight: bold;
-                }
-                #widgetMenuBtn:hover {
-                    background: rgba(0, 0, 0, 30);
-                }
-                #widgetCloseBtn:hover {
-                    background: rgba(255, 0, 0, 100);
-                    color: white;
-                }
-            """)
+        if theme == self.theme_name:
+            return
+        self.theme_name = theme
+        style = get_theme(theme)
+        self.core_bars.set_track_color(style.track_color)
+        self.setStyleSheet(style.stylesheet("floating_widget"))
             
     def apply_settings(self):
         """Apply current settings to widget"""
@@ -223,7 +152,7 @@ class FloatingWidget(QWidget):
             # Start with widget hidden
             self.hide()
         else:
-            self.auto_hide_timer.stop()
+            self.scheduler.cancel("auto_hide")
             self.show()
             
     def hide_widget(self):
@@ -231,16 +160,30 @@ class FloatingWidget(QWidget):
         if self.auto_hide:
             self.hide()
             
+    def showEvent(self, event):
+        super().showEvent(event)
+        if hasattr(self, 'on_visibility_changed'):
+            self.on_visibility_changed(True)
+            
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        if hasattr(self, 'on_visibility_changed'):
+            self.on_visibility_changed(False)
+            
     def enterEvent(self, event):
         """Mouse enters widget - show it"""
+        if hasattr(self, 'on_hover_changed'):
+            self.on_hover_changed(True)
         if self.auto_hide:
-            self.auto_hide_timer.stop()
+            self.scheduler.cancel("auto_hide")
             self.show()
             
     def leaveEvent(self, event):
         """Mouse leaves widget - hide after delay"""
+        if hasattr(self, 'on_hover_changed'):
+            self.on_hover_changed(False)
         if self.auto_hide:
-            self.auto_hide_timer.start(2000)  # Hide after 2 seconds
+            self.scheduler.after("auto_hide", 2, self.hide_widget)  # Hide after 2 seconds
 
     def close_widget(self):
         """Close the widget"""
@@ -270,6 +213,7 @@ class FloatingWidget(QWidget):
     def mouseMoveEvent(self, event: QMouseEvent):
         if self.dragging:
             self.move(event.globalPos() - self.drag_position)
+            self.settings.set_widget_position(self.x(), self.y())
             event.accept()
         elif self.resize_edge == 'bottom_right':
             new_size = QSize(
@@ -282,7 +226,11 @@ class FloatingWidget(QWidget):
         self.dragging = False
         self.resize_edge = None
         
-    def update_display(self):
-        self.cpu_value.setText(f"{self.system_monitor.cpu_usage}%")
-        self.ram_value.setText(f"{self.system_monitor.ram_usage}%")
-        self.time_label.setText(self.system_monitor.current_time)
\ No newline at end of file
+    def update_display(self, snapshot):
+        cpu = snapshot.cpu_usage
+        self.display_diff.set_text(self.cpu_value, "N/A" if cpu is None else f"{cpu}%")
+        self.display_diff.set_text(self.ram_value, f"{snapshot.ram_usage}%")
+        self.core_bars.set_values(snapshot.cpu_per_core)
+        
+    def update_clock(self, now):
+        self.display_diff.set_text(self.time_label, now.strftime("%H:%M:%S"))
\ No newline at end of file